@@ -14,6 +14,19 @@ from redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Progress streams expire this long after the last update
+PROGRESS_STREAM_TTL = 3600
+
+
+def progress_stream(task_id: str) -> str:
+    """Redis Stream carrying progress for a task."""
+    return f"stream:task:{task_id}"
+
+
+def completion_key(task_id: str) -> str:
+    """Redis key caching a finished task's final message (read by the dashboard WebSocket)."""
+    return f"task:complete:{task_id}"
+
 
 class ProgressPublisher:
     """
@@ -83,10 +96,11 @@ class ProgressPublisher:
         # Store last progress
         self.last_progress[task_id] = progress
 
-        # Publish to Redis Pub/Sub
-        await redis_client.publish(
-            channel=f"progress:task:{task_id}",
-            message=message
+        # Append to the task's Redis Stream
+        await redis_client.append_event(
+            progress_stream(task_id),
+            message,
+            ttl_seconds=PROGRESS_STREAM_TTL
         )
 
         logger.debug(f"Task {task_id}: {progress}% - {current_step} (ETA: {eta_seconds}s)")
@@ -115,9 +129,11 @@ class ProgressPublisher:
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        await redis_client.publish(
-            channel=f"progress:task:{task_id}",
-            message=message
+        await redis_client.append_event(
+            progress_stream(task_id),
+            message,
+            ttl_seconds=PROGRESS_STREAM_TTL,
+            cache_key=completion_key(task_id)
         )
 
         # Cleanup
@@ -159,9 +175,11 @@ class ProgressPublisher:
         elif error_type == "parsing_error":
             message["suggestion"] = "There was an issue parsing your document. Please verify it's a valid Word file."
 
-        await redis_client.publish(
-            channel=f"progress:task:{task_id}",
-            message=message
+        await redis_client.append_event(
+            progress_stream(task_id),
+            message,
+            ttl_seconds=PROGRESS_STREAM_TTL,
+            cache_key=completion_key(task_id)
         )
 
         # Cleanup
@@ -205,9 +223,10 @@ class ProgressPublisher:
         if details:
             message["details"] = details
 
-        await redis_client.publish(
-            channel=f"progress:task:{task_id}",
-            message=message
+        await redis_client.append_event(
+            progress_stream(task_id),
+            message,
+            ttl_seconds=PROGRESS_STREAM_TTL
         )
 
         logger.info(f"Task {task_id}: Milestone - {milestone}")
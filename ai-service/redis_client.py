@@ -2,7 +2,7 @@
 Redis Client for AI Service
 ============================
 
-Handles Redis Streams (task queue) and Pub/Sub (progress updates).
+Handles Redis Streams (task queue, progress and health events) and Pub/Sub.
 """
 
 import json
@@ -13,6 +13,9 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Entries kept per event stream (approximate MAXLEN trimming)
+EVENT_STREAM_MAXLEN = 1000
+
 
 class RedisClient:
     """Async Redis client for AI service."""
@@ -164,7 +167,56 @@ class RedisClient:
             return 0
 
     # ============================================================
-    # Redis Pub/Sub (Progress Updates - Publisher)
+    # Event Streams (Progress + Health Updates - Producer)
+    # ============================================================
+
+    async def append_event(
+        self,
+        stream_name: str,
+        message: Dict[str, Any],
+        max_len: int = EVENT_STREAM_MAXLEN,
+        ttl_seconds: Optional[int] = None,
+        cache_key: Optional[str] = None
+    ) -> str:
+        """
+        Append a JSON event to a stream (single 'data' field).
+
+        Args:
+            stream_name: Stream name (e.g., 'stream:task:123')
+            message: Event data as dictionary
+            max_len: Approximate number of entries to keep
+            ttl_seconds: Expire the whole stream after this many idle seconds
+            cache_key: Also SET the same JSON under this key (with ttl_seconds),
+                in the same round-trip
+
+        Returns:
+            Entry ID
+        """
+        try:
+            serialized = json.dumps(message)
+
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.xadd(
+                    stream_name,
+                    {"data": serialized},
+                    maxlen=max_len,
+                    approximate=True
+                )
+                if ttl_seconds:
+                    pipe.expire(stream_name, ttl_seconds)
+                if cache_key:
+                    pipe.set(cache_key, serialized, ex=ttl_seconds)
+                entry_id, *_ = await pipe.execute()
+
+            logger.debug(f"Appended event {entry_id} to {stream_name}")
+            return entry_id
+
+        except Exception as e:
+            logger.error(f"Failed to append event to {stream_name}: {e}")
+            raise
+
+    # ============================================================
+    # Redis Pub/Sub (Publisher)
     # ============================================================
 
     async def publish(self, channel: str, message: Dict[str, Any]) -> int:
@@ -223,17 +223,21 @@ class StreamConsumer:
         logger.debug(f"Message data: {message_data}")
 
         try:
-            # Parse message data (Redis returns strings, may need JSON parsing)
-            parsed_data = {}
-            for key, value in message_data.items():
-                try:
-                    # Try to parse as JSON if it looks like JSON
-                    if value.startswith('{') or value.startswith('[') or value.startswith('"'):
-                        parsed_data[key] = json.loads(value)
-                    else:
+            # The backend sends the whole task as JSON in a single 'data' field
+            if message_data.keys() == {'data'}:
+                parsed_data = json.loads(message_data['data'])
+            else:
+                # Older per-field messages (queued before the single-field format)
+                parsed_data = {}
+                for key, value in message_data.items():
+                    try:
+                        # Try to parse as JSON if it looks like JSON
+                        if value.startswith('{') or value.startswith('[') or value.startswith('"'):
+                            parsed_data[key] = json.loads(value)
+                        else:
+                            parsed_data[key] = value
+                    except json.JSONDecodeError:
                         parsed_data[key] = value
-                except json.JSONDecodeError:
-                    parsed_data[key] = value
 
             # Call the handler
             await handler(parsed_data)
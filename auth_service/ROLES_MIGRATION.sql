@@ -26,8 +26,11 @@ ON CONFLICT (name) DO NOTHING;
 -- Add role_id column to users table (nullable for migration)
 ALTER TABLE auth.users ADD COLUMN IF NOT EXISTS role_id INTEGER REFERENCES auth.roles(id);
 
--- Migrate existing users to use role_id
-UPDATE auth.users SET role_id = (SELECT id FROM auth.roles WHERE name = auth.users.role) WHERE role_id IS NULL;
+-- Migrate existing users to use role_id (set-based join)
+UPDATE auth.users AS u
+SET role_id = r.id
+FROM auth.roles AS r
+WHERE r.name = u.role AND u.role_id IS NULL;
 
 -- Create index on role_id
 CREATE INDEX IF NOT EXISTS idx_users_role_id ON auth.users(role_id);
@@ -28,89 +28,99 @@ async def run_migration():
     conn = await asyncpg.connect(DATABASE_URL)
     
     try:
-        # Create roles table
-        logger.info("Creating roles table...")
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS auth.roles (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL UNIQUE,
-                description TEXT,
-                permissions JSONB NOT NULL DEFAULT '{}'::jsonb,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
-            )
-        """)
+        # One transaction: a failed step leaves the schema untouched
+        async with conn.transaction():
+            # Create roles table
+            logger.info("Creating roles table...")
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS auth.roles (
+                    id SERIAL PRIMARY KEY,
+                    name VARCHAR(100) NOT NULL UNIQUE,
+                    description TEXT,
+                    permissions JSONB NOT NULL DEFAULT '{}'::jsonb,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+            """)
         
-        # Add is_system column if it doesn't exist
-        logger.info("Adding is_system column...")
-        await conn.execute("""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM information_schema.columns 
-                    WHERE table_schema='auth' AND table_name='roles' AND column_name='is_system'
-                ) THEN
-                    ALTER TABLE auth.roles ADD COLUMN is_system BOOLEAN NOT NULL DEFAULT false;
-                END IF;
-            END $$;
-        """)
+            # Add is_system column if it doesn't exist
+            logger.info("Adding is_system column...")
+            await conn.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM information_schema.columns 
+                        WHERE table_schema='auth' AND table_name='roles' AND column_name='is_system'
+                    ) THEN
+                        ALTER TABLE auth.roles ADD COLUMN is_system BOOLEAN NOT NULL DEFAULT false;
+                    END IF;
+                END $$;
+            """)
         
-        # Insert default system roles
-        logger.info("Inserting default roles...")
-        await conn.execute("""
-            INSERT INTO auth.roles (name, description, permissions, is_system) VALUES
-            ('admin', 'Full system access', 
-             '{"tabs": ["dashboard", "customers", "documents", "admin", "iam"], "chatwidget": true}'::jsonb, 
-             true),
-            ('viewer', 'Read-only access',
-             '{"tabs": ["dashboard", "customers", "documents"], "chatwidget": true}'::jsonb,
-             true)
-            ON CONFLICT (name) DO UPDATE SET 
-                permissions = EXCLUDED.permissions,
-                is_system = EXCLUDED.is_system
-        """)
+            # Insert default system roles
+            logger.info("Inserting default roles...")
+            await conn.execute("""
+                INSERT INTO auth.roles (name, description, permissions, is_system) VALUES
+                ('admin', 'Full system access', 
+                 '{"tabs": ["dashboard", "customers", "documents", "admin", "iam"], "chatwidget": true}'::jsonb, 
+                 true),
+                ('viewer', 'Read-only access',
+                 '{"tabs": ["dashboard", "customers", "documents"], "chatwidget": true}'::jsonb,
+                 true)
+                ON CONFLICT (name) DO UPDATE SET 
+                    permissions = EXCLUDED.permissions,
+                    is_system = EXCLUDED.is_system
+            """)
         
-        # Add role_id column to users table
-        logger.info("Adding role_id column to users table...")
-        await conn.execute("""
-            ALTER TABLE auth.users 
-            ADD COLUMN IF NOT EXISTS role_id INTEGER REFERENCES auth.roles(id)
-        """)
+            # Add role_id column to users table
+            logger.info("Adding role_id column to users table...")
+            await conn.execute("""
+                ALTER TABLE auth.users 
+                ADD COLUMN IF NOT EXISTS role_id INTEGER REFERENCES auth.roles(id)
+            """)
         
-        # Migrate existing users
-        logger.info("Migrating existing users...")
-        await conn.execute("""
-            UPDATE auth.users 
-            SET role_id = (SELECT id FROM auth.roles WHERE name = auth.users.role) 
-            WHERE role_id IS NULL
-        """)
+            # Migrate existing users (set-based join, not a per-row subquery)
+            logger.info("Migrating existing users...")
+            await conn.execute("""
+                UPDATE auth.users AS u
+                SET role_id = r.id
+                FROM auth.roles AS r
+                WHERE r.name = u.role AND u.role_id IS NULL
+            """)
         
-        # Create index
-        logger.info("Creating index...")
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_users_role_id ON auth.users(role_id)
-        """)
+            # Create index
+            logger.info("Creating index...")
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_users_role_id ON auth.users(role_id)
+            """)
         
-        # Create trigger
-        logger.info("Creating updated_at trigger...")
-        await conn.execute("""
-            CREATE OR REPLACE FUNCTION auth.update_roles_updated_at()
-            RETURNS TRIGGER AS $$
-            BEGIN
-                NEW.updated_at = NOW();
-                RETURN NEW;
-            END;
-            $$ LANGUAGE plpgsql
-        """)
-        
-        await conn.execute("""
-            DROP TRIGGER IF EXISTS trigger_roles_updated_at ON auth.roles;
-            CREATE TRIGGER trigger_roles_updated_at
-                BEFORE UPDATE ON auth.roles
-                FOR EACH ROW
-                EXECUTE FUNCTION auth.update_roles_updated_at()
-        """)
+            # Create trigger
+            logger.info("Creating updated_at trigger...")
+            await conn.execute("""
+                CREATE OR REPLACE FUNCTION auth.update_roles_updated_at()
+                RETURNS TRIGGER AS $$
+                BEGIN
+                    NEW.updated_at = NOW();
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+            """)
         
+            await conn.execute("""
+                DROP TRIGGER IF EXISTS trigger_roles_updated_at ON auth.roles;
+                CREATE TRIGGER trigger_roles_updated_at
+                    BEFORE UPDATE ON auth.roles
+                    FOR EACH ROW
+                    EXECUTE FUNCTION auth.update_roles_updated_at()
+            """)
+
+            # Verify the backfill inside the migration transaction
+            migrated, total = await conn.fetchrow("""
+                SELECT count(*) FILTER (WHERE role_id IS NOT NULL), count(*)
+                FROM auth.users
+            """)
+            logger.info(f"Users with role_id: {migrated}/{total}")
+
         logger.info("✅ Roles migration completed successfully!")
         
     except Exception as e:
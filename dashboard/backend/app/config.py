@@ -25,6 +25,7 @@ class Settings:
     DATABASE_APP_SCHEMA: str = os.getenv("DATABASE_APP_SCHEMA", "dna_app")
     DATABASE_AUTH_SCHEMA: str = os.getenv("DATABASE_AUTH_SCHEMA", "auth")
     DATABASE_CUSTOMER_SCHEMA: str = os.getenv("DATABASE_CUSTOMER_SCHEMA", "customer")
+    DATABASE_STATEMENT_CACHE_SIZE: int = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "256"))
 
     @property
     def DATABASE_URL(self) -> str:
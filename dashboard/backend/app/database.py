@@ -3,6 +3,7 @@ DNA Backend - Database Connection
 ==================================
 """
 
+import asyncio
 import asyncpg
 import logging
 from typing import Optional
@@ -12,6 +13,10 @@ from .config import settings
 logger = logging.getLogger(__name__)
 
 _db_pool: Optional[asyncpg.Pool] = None
+_keepalive_task: Optional[asyncio.Task] = None
+
+# Seconds between keep-alive pings of the idle pool connections
+POOL_KEEPALIVE_INTERVAL = 30
 
 
 async def get_db_pool() -> asyncpg.Pool:
@@ -23,7 +28,9 @@ async def get_db_pool() -> asyncpg.Pool:
             _db_pool = await asyncpg.create_pool(
                 settings.DATABASE_URL,
                 min_size=5,
-                max_size=20
+                max_size=20,
+                # Per-connection LRU of prepared statements, keyed by SQL text
+                statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE
             )
             logger.info("Database pool created")
         except Exception as e:
@@ -33,9 +40,56 @@ async def get_db_pool() -> asyncpg.Pool:
     return _db_pool
 
 
+async def warm_db_pool() -> None:
+    """
+    Open and exercise the pool's minimum connections.
+
+    Runs a cheap query on min_size connections at once, so the first
+    requests (and WebSocket connects) don't pay connection setup.
+    """
+    pool = await get_db_pool()
+
+    async def ping() -> None:
+        # Each ping owns its connection, so a failed acquire leaks nothing
+        async with pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+
+    await asyncio.gather(*(ping() for _ in range(pool.get_min_size())))
+
+
+async def _keep_pool_warm() -> None:
+    """Periodically ping one pooled connection so the pool stays alive."""
+    while True:
+        await asyncio.sleep(POOL_KEEPALIVE_INTERVAL)
+        try:
+            # One connection at a time: don't compete with live requests
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+        except Exception as e:
+            logger.warning(f"Database pool keep-alive failed: {e}")
+
+
+def start_pool_keepalive() -> None:
+    """Start the background keep-alive task (idempotent)."""
+    global _keepalive_task
+
+    if _keepalive_task is None or _keepalive_task.done():
+        _keepalive_task = asyncio.create_task(_keep_pool_warm())
+        logger.info("Database pool keep-alive started")
+
+
 async def close_db_pool() -> None:
     """Close database connection pool."""
-    global _db_pool
+    global _db_pool, _keepalive_task
+
+    if _keepalive_task:
+        _keepalive_task.cancel()
+        try:
+            await _keepalive_task
+        except asyncio.CancelledError:
+            pass
+        _keepalive_task = None
 
     if _db_pool:
         await _db_pool.close()
@@ -2,12 +2,11 @@
 Health Message Publisher
 ========================
 
-Publishes component health status messages to Redis Pub/Sub for real-time monitoring.
+Publishes component health status messages to a Redis Stream for real-time monitoring.
 
-Channel: system:health:alerts
+Stream: system:health:alerts
 """
 
-import json
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -15,12 +14,12 @@ from ..redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
-# Redis channel for health alerts (using Pub/Sub for immediate delivery)
-HEALTH_CHANNEL = "system:health:alerts"
+# Redis stream for health alerts (read with XREAD BLOCK by the health WebSocket)
+HEALTH_STREAM = "system:health:alerts"
 
 
 class HealthPublisher:
-    """Publishes health status messages to Redis Pub/Sub."""
+    """Publishes health status messages to the health stream."""
 
     @staticmethod
     async def publish(
@@ -31,7 +30,7 @@ class HealthPublisher:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """
-        Publish a health message to the Pub/Sub channel.
+        Publish a health message to the health stream.
 
         Args:
             component: Component name (e.g., "database", "redis", "ai-worker", "backend")
@@ -50,11 +49,10 @@ class HealthPublisher:
                 "metadata": metadata or {}
             }
 
-            # Publish to Redis Pub/Sub channel
-            serialized = json.dumps(health_message)
-            subscribers = await redis_client._client.publish(HEALTH_CHANNEL, serialized)
+            # Append to Redis Stream (trimmed to the latest entries)
+            entry_id = await redis_client.append_event(HEALTH_STREAM, health_message)
 
-            logger.info(f"Health published [{component}]: {status} - {message} ({subscribers} subscribers)")
+            logger.info(f"Health published [{component}]: {status} - {message} ({entry_id})")
 
         except Exception as e:
             # Don't let health monitoring failures break the application
@@ -9,7 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from .config import settings
-from .database import get_db_pool, close_db_pool
+from .database import get_db_pool, close_db_pool, warm_db_pool, start_pool_keepalive
 from .redis_client import redis_client
 from .auth import get_current_user, verify_token
 from .chat import chat_service
@@ -82,9 +82,11 @@ async def startup_event():
         logger.error(f"Configuration error: {e}")
         raise
 
-    # Initialize database pool
+    # Initialize database pool and keep its connections warm
     try:
         await get_db_pool()
+        await warm_db_pool()
+        start_pool_keepalive()
         logger.info("Database pool initialized")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -247,7 +249,7 @@ async def websocket_task_progress(websocket: WebSocket, task_id: str):
     """
     WebSocket endpoint for real-time task progress updates.
 
-    Subscribes to Redis Pub/Sub channel: progress:task:{task_id}
+    Reads Redis stream: stream:task:{task_id}
     Forwards all progress messages to connected WebSocket client.
 
     No authentication required (task_id acts as secret).
@@ -273,5 +275,9 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.RELOAD
+        reload=settings.RELOAD,
+        loop="uvloop",
+        ws="websockets",
+        ws_max_size=1048576,
+        ws_ping_interval=20
     )
@@ -1,47 +1,102 @@
 """
 Redis client for DNA application.
-Handles Redis Streams (task queue) and Pub/Sub (progress updates).
+Handles Redis Streams (task queue, progress and health events) and Pub/Sub.
 """
 
-import json
 import logging
-from typing import Any, Optional, Dict
+import orjson
+from typing import Any, Optional, Dict, List, Tuple, Union
 import redis.asyncio as redis
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Entries kept per event stream (approximate MAXLEN trimming)
+EVENT_STREAM_MAXLEN = 1000
+
+
+# Stream names may be passed pre-encoded; redis-py sends bytes as-is
+StreamName = Union[str, bytes]
+
+# The module's one JSON encoder (streams, events, pub/sub), bound once so
+# the write paths skip the module attribute lookup
+_DUMPS = orjson.dumps
+
+
+def _encode_message(data: Dict[str, Any]) -> Dict[str, bytes]:
+    """Encode a stream message as one JSON 'data' field (one encode per message)."""
+    return {'data': _DUMPS(data)}
+
 
 class RedisClient:
     """Async Redis client wrapper for DNA application."""
     
-    def __init__(self):
+    def __init__(self, db: Optional[int] = None):
+        # Logical database index (defaults to REDIS_DB)
+        self._db = settings.REDIS_DB if db is None else db
         self._pool: Optional[redis.ConnectionPool] = None
         self._client: Optional[redis.Redis] = None
+        # Undecoded client: event stream replies stay bytes so JSON payloads
+        # go straight to orjson
+        self._raw_pool: Optional[redis.ConnectionPool] = None
+        self._raw_client: Optional[redis.Redis] = None
         self._pubsub: Optional[redis.client.PubSub] = None
         
     async def connect(self):
-        """Initialize Redis connection pool."""
+        """
+        Initialize Redis clients.
+
+        Connection pools are created on first connect and kept across
+        disconnect(close_pools=False), so reconnecting reuses open sockets.
+        """
         if self._pool is None:
             self._pool = redis.ConnectionPool(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 password=settings.REDIS_PASSWORD,
-                db=0,
+                db=self._db,
                 decode_responses=True,
-                max_connections=20
+                max_connections=20,
+                socket_keepalive=True
+            )
+            self._raw_pool = redis.ConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                password=settings.REDIS_PASSWORD,
+                db=self._db,
+                decode_responses=False,
+                max_connections=20,
+                socket_keepalive=True
             )
+        if self._client is None:
             self._client = redis.Redis(connection_pool=self._pool)
+            self._raw_client = redis.Redis(connection_pool=self._raw_pool)
             logger.info(f"Redis connected to {settings.REDIS_HOST}:{settings.REDIS_PORT}")
             
-    async def disconnect(self):
-        """Close Redis connection pool."""
+    async def disconnect(self, close_pools: bool = True):
+        """
+        Close Redis clients.
+
+        Args:
+            close_pools: Also close the pooled connections. Pass False to keep
+                them open for a later connect().
+        """
         if self._pubsub:
             await self._pubsub.close()
+            self._pubsub = None
         if self._client:
             await self._client.close()
-        if self._pool:
-            await self._pool.disconnect()
+            self._client = None
+        if self._raw_client:
+            await self._raw_client.close()
+            self._raw_client = None
+        if close_pools:
+            if self._pool:
+                await self._pool.disconnect()
+                self._pool = None
+            if self._raw_pool:
+                await self._raw_pool.disconnect()
+                self._raw_pool = None
         logger.info("Redis disconnected")
         
     async def ping(self) -> bool:
@@ -51,6 +106,11 @@ class RedisClient:
         except Exception as e:
             logger.error(f"Redis ping failed: {e}")
             return False
+
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Underlying decoded client, for commands this wrapper doesn't cover."""
+        return self._client
     
     # ============================================================
     # Redis Streams (Task Queue)
@@ -58,31 +118,35 @@ class RedisClient:
     
     async def add_to_stream(
         self, 
-        stream_name: str, 
+        stream_name: StreamName, 
         data: Dict[str, Any],
-        max_len: int = 10000
-    ) -> str:
+        max_len: int = 10000,
+        approximate: bool = True,
+        nomkstream: bool = False
+    ) -> Optional[str]:
         """
         Add message to Redis Stream.
         
         Args:
             stream_name: Name of the stream (e.g., 'template:parse')
-            data: Message data as dictionary
+            data: Message data as dictionary (stored as JSON in one 'data' field)
             max_len: Maximum stream length (for memory management)
+            approximate: Trim with MAXLEN ~ (cheap; Redis only drops whole
+                internal nodes, so the stream may exceed max_len for a while).
+                False trims to exactly max_len.
+            nomkstream: Don't create the stream if it is missing (XADD
+                NOMKSTREAM); the add is skipped and None returned instead.
             
         Returns:
-            Message ID
+            Message ID (None if nomkstream and the stream does not exist)
         """
         try:
-            # Convert dict values to strings for Redis
-            serialized_data = {k: json.dumps(v) if not isinstance(v, str) else v 
-                             for k, v in data.items()}
-            
             message_id = await self._client.xadd(
                 stream_name,
-                serialized_data,
+                _encode_message(data),
                 maxlen=max_len,
-                approximate=True
+                approximate=approximate,
+                nomkstream=nomkstream
             )
             
             logger.info(f"Added message {message_id} to stream {stream_name}")
@@ -92,28 +156,73 @@ class RedisClient:
             logger.error(f"Failed to add to stream {stream_name}: {e}")
             raise
     
+    async def add_many_to_stream(
+        self,
+        stream_name: StreamName,
+        items: List[Dict[str, Any]],
+        max_len: int = 10000,
+        approximate: bool = True,
+        nomkstream: bool = False
+    ) -> List[str]:
+        """
+        Add several messages to a Redis Stream in one round-trip.
+        
+        Args:
+            stream_name: Name of the stream
+            items: Message data dictionaries, added in order
+            max_len: Maximum stream length (for memory management)
+            approximate: Trim with MAXLEN ~ (see add_to_stream)
+            nomkstream: Only add to an existing stream (see add_to_stream)
+            
+        Returns:
+            Message IDs, in the same order as items
+        """
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for data in items:
+                    pipe.xadd(
+                        stream_name,
+                        _encode_message(data),
+                        maxlen=max_len,
+                        approximate=approximate,
+                        nomkstream=nomkstream
+                    )
+                message_ids = await pipe.execute()
+            
+            logger.info(f"Added {len(message_ids)} messages to stream {stream_name}")
+            return message_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to add to stream {stream_name}: {e}")
+            raise
+    
     async def read_stream(
         self,
-        stream_name: str,
+        stream_name: StreamName,
         count: int = 10,
-        block: int = 0
+        block_ms: Optional[int] = None,
+        last_id: str = '0'
     ) -> list:
         """
         Read messages from Redis Stream.
         
         Args:
             stream_name: Name of the stream
-            count: Number of messages to read
-            block: Block time in milliseconds (0 = don't block)
+            count: Max number of messages to read
+            block_ms: Max time to wait for messages in milliseconds
+                (None = don't block; 0 would block forever)
+            last_id: Read messages after this ID ('0' = from the beginning,
+                '$' = only messages added while blocking)
             
         Returns:
-            List of messages
+            List of (stream_name, [(message_id, fields), ...]) tuples;
+            messages from add_to_stream carry their JSON in fields['data']
         """
         try:
             messages = await self._client.xread(
-                {stream_name: '$'},  # Read from latest
+                {stream_name: last_id},
                 count=count,
-                block=block
+                block=block_ms
             )
             return messages
             
@@ -123,7 +232,7 @@ class RedisClient:
     
     async def create_consumer_group(
         self,
-        stream_name: str,
+        stream_name: StreamName,
         group_name: str,
         start_id: str = "0"
     ):
@@ -150,7 +259,7 @@ class RedisClient:
             else:
                 raise
     
-    async def get_stream_length(self, stream_name: str) -> int:
+    async def get_stream_length(self, stream_name: StreamName) -> int:
         """Get number of messages in stream."""
         try:
             return await self._client.xlen(stream_name)
@@ -159,7 +268,7 @@ class RedisClient:
             return 0
     
     # ============================================================
-    # Redis Pub/Sub (Progress Updates)
+    # Redis Pub/Sub
     # ============================================================
     
     async def publish(self, channel: str, message: Dict[str, Any]) -> int:
@@ -174,7 +283,7 @@ class RedisClient:
             Number of subscribers that received the message
         """
         try:
-            serialized = json.dumps(message)
+            serialized = _DUMPS(message)
             subscribers = await self._client.publish(channel, serialized)
             
             logger.debug(f"Published to {channel}, {subscribers} subscribers")
@@ -212,7 +321,106 @@ class RedisClient:
         if self._pubsub:
             await self._pubsub.unsubscribe(*channels)
             logger.info(f"Unsubscribed from channels: {channels}")
+
+    # ============================================================
+    # Event Streams (Progress + Health Updates)
+    # ============================================================
+
+    async def append_event(
+        self,
+        stream_name: str,
+        message: Dict[str, Any],
+        max_len: int = EVENT_STREAM_MAXLEN,
+        ttl_seconds: Optional[int] = None
+    ) -> str:
+        """
+        Append a JSON event to a stream (single 'data' field).
+
+        Args:
+            stream_name: Stream name (e.g., 'stream:task:123')
+            message: Event data as dictionary
+            max_len: Approximate number of entries to keep
+            ttl_seconds: Expire the whole stream after this many idle seconds
+
+        Returns:
+            Entry ID
+        """
+        try:
+            serialized = _DUMPS(message)
+
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.xadd(
+                    stream_name,
+                    {"data": serialized},
+                    maxlen=max_len,
+                    approximate=True
+                )
+                if ttl_seconds:
+                    pipe.expire(stream_name, ttl_seconds)
+                entry_id, *_ = await pipe.execute()
+
+            logger.debug(f"Appended event {entry_id} to {stream_name}")
+            return entry_id
+
+        except Exception as e:
+            logger.error(f"Failed to append event to {stream_name}: {e}")
+            raise
+
+    async def latest_event_id(self, stream_name: str) -> bytes:
+        """
+        ID of the newest entry in a stream (b'0-0' if empty or missing).
+
+        Readers start from this instead of '$' so nothing appended between
+        two blocking reads is missed.
+        """
+        entries = await self._raw_client.xrevrange(stream_name, count=1)
+        return entries[0][0] if entries else b"0-0"
+
+    async def read_events(
+        self,
+        stream_name: str,
+        last_id: Union[str, bytes],
+        count: int = 100,
+        block_ms: int = 1000
+    ) -> Tuple[Union[str, bytes], List[bytes]]:
+        """
+        Block for events after last_id and return up to count of them at once.
+
+        Args:
+            stream_name: Stream name
+            last_id: Entry ID to read after ('0' = from the beginning)
+            count: Max entries per round-trip
+            block_ms: Max time to wait for new entries
+
+        Returns:
+            (new last_id, raw JSON payloads); payloads is empty on timeout
+        """
+        response = await self._raw_client.xread(
+            {stream_name: last_id},
+            count=count,
+            block=block_ms
+        )
+
+        payloads = []
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                last_id = entry_id
+                payloads.append(fields.get(b"data", b""))
+
+        return last_id, payloads
     
+    # ============================================================
+    # Cached Payloads
+    # ============================================================
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """Get a cached value as undecoded bytes (None if missing)."""
+        return await self._raw_client.get(key)
+
+    async def set_raw(self, key: str, value: bytes, ttl_seconds: int):
+        """Cache a pre-encoded value with an expiry."""
+        await self._raw_client.set(key, value, ex=ttl_seconds)
+
     # ============================================================
     # Utility Methods
     # ============================================================
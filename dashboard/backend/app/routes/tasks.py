@@ -192,7 +192,7 @@ async def update_task_progress(
     if not success:
         raise HTTPException(status_code=404, detail=f"Task not found: {task_id}")
     
-    # Publish progress update to Redis Pub/Sub
+    # Publish progress update to the task's Redis Stream
     if progress is not None or current_step:
         await task_service.publish_progress(task_id, {
             'status': status,
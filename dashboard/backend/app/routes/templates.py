@@ -7,8 +7,8 @@ Template upload, parsing, and management endpoints.
 import logging
 import os
 import uuid
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
 from datetime import datetime
 
 from ..models import (
@@ -461,6 +461,7 @@ async def generate_document_from_text(
 async def refine_document(
     document_id: int,
     feedback: str,
+    include: Optional[str] = None,
     current_user = Depends(get_current_user)
 ):
     """
@@ -469,6 +470,8 @@ async def refine_document(
     Args:
         document_id: The document to refine
         feedback: User feedback on what to improve/change
+        include: "preview" to also return the refined filled_document,
+                 saving a separate preview request
     """
     try:
         pool = await get_db_pool()
@@ -513,7 +516,7 @@ async def refine_document(
         
         logger.info(f"Refined document {document_id}, new version {doc_row['version'] + 1}")
         
-        return {
+        result = {
             "document_id": document_id,
             "version": doc_row['version'] + 1,
             "completion_percentage": completion,
@@ -521,6 +524,15 @@ async def refine_document(
             "changes_applied": True
         }
         
+        # Template is already loaded, so the preview costs no extra query
+        if include == "preview":
+            result["filled_document"] = parser.generate_filled_document(
+                template_structure=doc_row['template_structure'],
+                filled_data=new_filled_data
+            )
+        
+        return result
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -531,13 +543,18 @@ async def refine_document(
 @router.get("/documents/{document_id}/preview")
 async def preview_document(
     document_id: int,
+    preview_chars: Optional[int] = Query(None, ge=0),
     current_user = Depends(get_current_user)
 ):
     """
     Preview final filled document with all tags replaced.
     
+    Args:
+        document_id: The document to preview
+        preview_chars: Only return the first N characters of the document (>= 0)
+    
     Returns:
-        - Filled document text
+        - Filled document text (truncated to preview_chars if given)
         - Completion percentage
         - Missing required fields (if any)
     """
@@ -576,10 +593,18 @@ async def preview_document(
                         "type": field.get('type', 'text')
                     })
         
+        # Truncate here so callers that only show a snippet don't download the whole document
+        total_length = len(filled_document)
+        truncated = preview_chars is not None and total_length > preview_chars
+        if truncated:
+            filled_document = filled_document[:preview_chars]
+        
         return {
             "document_id": document_id,
             "template_name": doc_row['name'],
             "filled_document": filled_document,
+            "truncated": truncated,
+            "total_length": total_length,
             "completion_percentage": doc_row['completion_percentage'],
             "missing_required_fields": missing_fields,
             "is_complete": len(missing_fields) == 0
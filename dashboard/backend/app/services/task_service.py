@@ -1,6 +1,6 @@
 """
 Task Service - AI Task Management
-Handles task creation, updates, and Redis Stream/Pub-Sub integration
+Handles task creation, updates, and Redis Stream integration
 """
 import uuid
 import json
@@ -12,6 +12,9 @@ from ..redis_client import redis_client
 from ..database import get_db_pool
 from ..config import settings
 
+# Progress streams expire this long after the last update
+PROGRESS_STREAM_TTL = 3600
+
 
 async def create_task(
     task_type: str,
@@ -337,18 +340,18 @@ async def cancel_task(task_id: str) -> bool:
         return result.split()[-1] == '1'
 
 
-async def publish_progress(task_id: str, progress_data: Dict[str, Any]) -> int:
+async def publish_progress(task_id: str, progress_data: Dict[str, Any]) -> str:
     """
-    Publish task progress update to Redis Pub/Sub
+    Publish task progress update to the task's Redis Stream
     
     Args:
         task_id: Task UUID
         progress_data: Progress update data (progress, current_step, etc.)
     
     Returns:
-        Number of subscribers who received the message
+        Stream entry ID
     """
-    channel = f"progress:task:{task_id}"
+    stream_name = f"stream:task:{task_id}"
     
     message = {
         'task_id': task_id,
@@ -356,7 +359,11 @@ async def publish_progress(task_id: str, progress_data: Dict[str, Any]) -> int:
         **progress_data
     }
     
-    return await redis_client.publish(channel, message)
+    return await redis_client.append_event(
+        stream_name,
+        message,
+        ttl_seconds=PROGRESS_STREAM_TTL
+    )
 
 
 def get_stream_name(task_type: str) -> str:
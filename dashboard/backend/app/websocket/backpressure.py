@@ -0,0 +1,55 @@
+"""
+WebSocket Backpressure Queue
+============================
+
+Bounded queue placed between a Redis listener and a WebSocket sender.
+
+The listener never waits on a slow client: when the queue is full the oldest
+message is dropped to make room and the drop is counted. The sender reports
+drops to the client as {"type": "dropped", "count": N} so it can re-sync.
+Per-connection memory stays fixed however fast Redis publishes.
+"""
+
+import asyncio
+from typing import Any, List, Optional
+import orjson
+
+# Max messages buffered per WebSocket client
+CLIENT_QUEUE_SIZE = 512
+
+
+class DropOldestQueue(asyncio.Queue):
+    """asyncio.Queue that evicts its oldest item instead of blocking when full."""
+
+    def __init__(self, maxsize: int = CLIENT_QUEUE_SIZE):
+        super().__init__(maxsize=maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item: Any) -> None:
+        """Enqueue without waiting, dropping the oldest item on overflow."""
+        try:
+            self.put_nowait(item)
+        except asyncio.QueueFull:
+            self.get_nowait()
+            self.put_nowait(item)
+            self.dropped += 1
+
+    def drain(self) -> List[Any]:
+        """Take every item currently queued without waiting."""
+        items = []
+        while not self.empty():
+            items.append(self.get_nowait())
+        return items
+
+    def take_dropped_frame(self) -> Optional[bytes]:
+        """
+        Encode and reset the drop counter.
+
+        Returns:
+            {"type": "dropped", "count": N} bytes, or None if nothing was dropped
+        """
+        if not self.dropped:
+            return None
+
+        count, self.dropped = self.dropped, 0
+        return orjson.dumps({"type": "dropped", "count": count})
@@ -0,0 +1,46 @@
+"""
+WebSocket Frame Helpers
+=======================
+
+Helpers for writing pre-encoded JSON payloads to WebSocket clients.
+
+Payloads are serialized once with orjson (bytes) and written as-is in
+binary frames, so the send path never re-encodes a message: no stdlib json
+pass and no str round-trip. Dashboard clients decode binary frames as UTF-8
+JSON.
+Entries read from Redis in one round-trip are forwarded as a single batch
+frame: {"type": "batch", "messages": [...]}.
+"""
+
+from typing import List
+from fastapi import WebSocket
+
+_BATCH_PREFIX = b'{"type":"batch","messages":['
+_BATCH_SUFFIX = b']}'
+
+
+async def send_frame(websocket: WebSocket, payload: bytes) -> None:
+    """
+    Send a pre-encoded JSON payload to the client as a binary frame.
+
+    Writes the ASGI message directly rather than going through
+    send_bytes/send_json, so no per-call wrapping or encoding happens.
+
+    Args:
+        websocket: Connected WebSocket
+        payload: UTF-8 JSON bytes (e.g. from orjson.dumps)
+    """
+    await websocket.send({"type": "websocket.send", "bytes": payload})
+
+
+def encode_batch(payloads: List[bytes]) -> bytes:
+    """
+    Combine pre-encoded messages into one frame.
+
+    A single message is passed through unchanged; several are joined into
+    a batch envelope without decoding or re-encoding them.
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+    return _BATCH_PREFIX + b",".join(payloads) + _BATCH_SUFFIX
+
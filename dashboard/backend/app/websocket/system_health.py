@@ -5,20 +5,57 @@ System Health WebSocket Handler
 WebSocket endpoint for streaming real-time system health alerts.
 
 Endpoint: /ws/system/health
-Subscribes to: system:health:alerts stream
+Reads: system:health:alerts stream (XREAD BLOCK, batched per round-trip)
 """
 
 import asyncio
 import json
 import logging
+from datetime import datetime
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 from ..redis_client import redis_client
+from .backpressure import DropOldestQueue
+from .frames import encode_batch, send_frame
 
 logger = logging.getLogger(__name__)
 
 HEALTH_STREAM = "system:health:alerts"
 
+# Startup status for all components (static, sent on every connect)
+STARTUP_COMPONENTS = [
+    ("database", "Database pool is active"),
+    ("redis", "Redis connection is active"),
+    ("backend", "Backend service is running"),
+    ("ai-worker", "AI worker service status")
+]
+
+# Pre-encoded startup frame built once at import; only the timestamp is
+# patched per connection, so connecting costs one bytes.replace and one send
+_TS_SENTINEL = b"__TS__"
+_STARTUP_TEMPLATE: bytes = orjson.dumps({
+    "type": "startup_batch",
+    "messages": [
+        {
+            "type": "subscribed",
+            "channel": HEALTH_STREAM,
+            "timestamp": _TS_SENTINEL.decode()
+        },
+        *(
+            {
+                "component": component,
+                "status": "healthy",
+                "message": message,
+                "severity": "info",
+                "timestamp": _TS_SENTINEL.decode(),
+                "metadata": {"source": "startup"}
+            }
+            for component, message in STARTUP_COMPONENTS
+        )
+    ]
+})
+
 
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -29,90 +66,58 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     logger.info("System health WebSocket connected")
 
-    pubsub = None
-    connection_alive = True
+    listener_task = None
+    sender_task = None
+    receiver_task = None
+    stream_name = HEALTH_STREAM
 
     try:
-        # Subscribe to health stream via Pub/Sub
-        # Note: We'll convert stream to pub/sub for real-time delivery
-        channel_name = HEALTH_STREAM
+        # Only forward alerts added from now on; the startup frame covers the rest
+        last_id = await redis_client.latest_event_id(stream_name)
+        logger.info(f"Reading health stream: {stream_name}")
 
-        # Create Pub/Sub subscription
-        pubsub = redis_client._client.pubsub()
-        await pubsub.subscribe(channel_name)
-        logger.info(f"Subscribed to health channel: {channel_name}")
+        # Send subscription confirmation + component statuses in one frame
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        await send_frame(
+            websocket,
+            _STARTUP_TEMPLATE.replace(_TS_SENTINEL, timestamp.encode())
+        )
 
-        # Send subscription confirmation
-        await websocket.send_json({
-            "type": "subscribed",
-            "channel": channel_name,
-            "timestamp": asyncio.get_event_loop().time()
-        })
-
-        # Send welcome message with current system status
-        import datetime
-        timestamp = datetime.datetime.utcnow().isoformat() + "Z"
-
-        # Send status for all components
-        components = [
-            ("database", "Database pool is active"),
-            ("redis", "Redis connection is active"),
-            ("backend", "Backend service is running"),
-            ("ai-worker", "AI worker service status")
-        ]
-
-        for component, message in components:
-            await websocket.send_json({
-                "component": component,
-                "status": "healthy",
-                "message": message,
-                "severity": "info",
-                "timestamp": timestamp,
-                "metadata": {"source": "startup"}
-            })
+        # Encoded messages waiting for the sender; bounded so a slow client
+        # drops its oldest alerts instead of stalling the Redis listener
+        outbox = DropOldestQueue()
 
         # Listen for messages
         async def listen_redis():
-            """Listen for Redis Pub/Sub messages and forward to WebSocket."""
-            nonlocal connection_alive
+            """Read health stream entries and queue them for the client."""
+            nonlocal last_id
             logger.info("Health listener task started, waiting for messages...")
             try:
-                async for message in pubsub.listen():
-                    logger.debug(f"Received Pub/Sub message: {message}")
-
-                    if not connection_alive:
-                        break
+                while True:
+                    # One blocking round-trip returns every entry added since last_id
+                    last_id, payloads = await redis_client.read_events(stream_name, last_id)
 
-                    if message['type'] == 'message':
+                    for data in payloads:
                         try:
-                            # Parse message data
-                            data = message['data']
-                            if isinstance(data, bytes):
-                                data = data.decode('utf-8')
-
-                            logger.info(f"Processing health message: {data}")
+                            # Raw bytes; orjson parses them without a decode step
+                            logger.debug("Processing health message: %s", data)
 
                             # Try to parse as JSON
                             try:
-                                parsed_data = json.loads(data)
-                            except json.JSONDecodeError:
+                                parsed_data = orjson.loads(data)
+                            except orjson.JSONDecodeError:
                                 # If not JSON, wrap in standard format
                                 parsed_data = {
                                     "type": "health_alert",
-                                    "message": data
+                                    "message": data.decode('utf-8', errors='replace')
                                 }
 
                             # Ensure type field exists
                             if 'type' not in parsed_data:
                                 parsed_data['type'] = 'health_alert'
 
-                            # Forward to WebSocket
-                            if websocket.client_state == WebSocketState.CONNECTED:
-                                await websocket.send_json(parsed_data)
-                                logger.info(f"Forwarded health message to WebSocket client")
-                            else:
-                                connection_alive = False
-                                break
+                            # Encode once
+                            outbox.put_latest(orjson.dumps(parsed_data))
 
                         except Exception as e:
                             logger.error(f"Error processing health message: {e}")
@@ -122,55 +127,75 @@ async def websocket_endpoint(websocket: WebSocket):
                 raise
             except Exception as e:
                 logger.error(f"Error in health listener: {e}")
-                connection_alive = False
 
-        # Start listener task
-        listener_task = asyncio.create_task(listen_redis())
+        # Forward queued messages to the client
+        async def send_alerts():
+            """Send everything queued as one frame per wake-up."""
+            try:
+                while True:
+                    payloads = [await outbox.get()]
+                    payloads.extend(outbox.drain())
 
-        # Keep connection alive and handle client messages (ping/pong)
-        try:
-            while connection_alive:
-                try:
-                    data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
+                    # Tell the client if its queue overflowed so it can re-sync
+                    dropped_frame = outbox.take_dropped_frame()
+                    if dropped_frame:
+                        logger.warning("Dropped queued health messages for slow client")
+                        payloads.insert(0, dropped_frame)
+
+                    # Forward the whole batch as one frame (raises once the client is gone)
+                    await send_frame(websocket, encode_batch(payloads))
+                    logger.debug("Forwarded %d health message(s) to WebSocket client", len(payloads))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error sending health messages: {e}")
+
+        # Handle client messages (ping/pong) until the client goes away.
+        # No receive timeout: the task sleeps until a frame or disconnect arrives.
+        async def receive_client():
+            """Answer client pings and signal disconnect."""
+            try:
+                while True:
+                    data = await websocket.receive_text()
 
                     # Handle ping/pong
                     try:
                         message = json.loads(data)
                         if message.get('type') == 'ping':
-                            await websocket.send_json({
+                            await send_frame(websocket, orjson.dumps({
                                 "type": "pong",
                                 "timestamp": message.get('timestamp')
-                            })
+                            }))
                     except json.JSONDecodeError:
                         pass
 
-                except asyncio.TimeoutError:
-                    continue
+            except WebSocketDisconnect:
+                logger.info("System health WebSocket disconnected")
+            except Exception as e:
+                logger.error(f"Error in system health receive loop: {e}")
 
-        except WebSocketDisconnect:
-            logger.info("System health WebSocket disconnected")
-            connection_alive = False
+        # Start listener, sender and receiver; the connection ends when any of them returns
+        listener_task = asyncio.create_task(listen_redis())
+        sender_task = asyncio.create_task(send_alerts())
+        receiver_task = asyncio.create_task(receive_client())
+        await asyncio.wait(
+            {listener_task, sender_task, receiver_task},
+            return_when=asyncio.FIRST_COMPLETED
+        )
 
     except Exception as e:
         logger.error(f"Error in system health WebSocket: {e}")
 
     finally:
-        # Cleanup
-        connection_alive = False
-
-        if listener_task:
-            listener_task.cancel()
-            try:
-                await listener_task
-            except asyncio.CancelledError:
-                pass
-
-        if pubsub:
-            try:
-                await pubsub.unsubscribe(channel_name)
-                await pubsub.close()
-            except Exception as e:
-                logger.error(f"Error unsubscribing from health channel: {e}")
+        # Cleanup: cancel whichever tasks are still running
+        for task in (listener_task, sender_task, receiver_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
         try:
             if websocket.client_state == WebSocketState.CONNECTED:
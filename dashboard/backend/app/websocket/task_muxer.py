@@ -0,0 +1,178 @@
+"""
+Task Progress Stream Multiplexer
+================================
+
+Shares one Redis Stream reader per task among all WebSocket clients
+watching that task.
+
+Each watched task has a single listener that reads the task's stream with
+XREAD BLOCK (up to STREAM_READ_COUNT entries per round-trip), parses and
+encodes every message once, then fans the result out to one bounded queue
+per attached client. A slow client only loses its own oldest updates; it
+never stalls the listener or the other clients.
+Redis readers scale with the number of distinct tasks being watched,
+not with the number of open WebSockets.
+
+A new reader starts from the beginning of the stream, so the first client
+to watch a task also receives the updates published before it connected.
+
+Redis Stream: stream:task:{task_id}
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+import orjson
+from ..redis_client import redis_client
+from .backpressure import DropOldestQueue
+
+logger = logging.getLogger(__name__)
+
+# Queue item: parsed message plus its pre-encoded JSON bytes.
+# None is queued when the stream reader fails.
+TaskUpdate = Tuple[Dict[str, Any], bytes]
+
+# Max stream entries fetched per XREAD round-trip
+STREAM_READ_COUNT = 100
+
+# Max time one XREAD waits for new entries before looping (ms)
+STREAM_BLOCK_MS = 1000
+
+
+def progress_stream(task_id: str) -> str:
+    """Redis Stream carrying progress for a task."""
+    return f"stream:task:{task_id}"
+
+
+class _TaskSubscription:
+    """One stream reader and the client queues fed by it."""
+
+    def __init__(self):
+        self.queues: Set[DropOldestQueue] = set()
+        self.listener: Optional[asyncio.Task] = None
+
+
+class TaskMuxer:
+    """Reference-counted Redis Stream readers keyed on task_id."""
+
+    def __init__(self):
+        self._subscriptions: Dict[str, _TaskSubscription] = {}
+        self._lock = asyncio.Lock()
+
+    async def attach(self, task_id: str) -> DropOldestQueue:
+        """
+        Attach a client to a task's progress stream.
+
+        Starts a stream reader if this is the first client for the task.
+
+        Returns:
+            Bounded queue receiving TaskUpdate items (None if the reader fails)
+        """
+        async with self._lock:
+            subscription = self._subscriptions.get(task_id)
+
+            if subscription is None:
+                subscription = _TaskSubscription()
+                subscription.listener = asyncio.create_task(
+                    self._listen(task_id, subscription)
+                )
+                self._subscriptions[task_id] = subscription
+                logger.info(f"Reading Redis stream: {progress_stream(task_id)}")
+
+            queue = DropOldestQueue()
+            subscription.queues.add(queue)
+            return queue
+
+    async def detach(self, task_id: str, queue: DropOldestQueue):
+        """
+        Detach a client; stops the reader once the last client for the task leaves.
+        """
+        async with self._lock:
+            subscription = self._subscriptions.get(task_id)
+            if subscription is None:
+                return
+
+            subscription.queues.discard(queue)
+            if subscription.queues:
+                return
+
+            del self._subscriptions[task_id]
+
+        await self._close(task_id, subscription)
+
+    async def _close(self, task_id: str, subscription: _TaskSubscription):
+        """Stop the stream reader."""
+        if subscription.listener and subscription.listener is not asyncio.current_task():
+            subscription.listener.cancel()
+            try:
+                await subscription.listener
+            except asyncio.CancelledError:
+                pass
+
+        logger.info(f"Stopped reading Redis stream: {progress_stream(task_id)}")
+
+    async def _listen(self, task_id: str, subscription: _TaskSubscription):
+        """Parse each stream entry once and fan it out to every client queue."""
+        stream_name = progress_stream(task_id)
+        last_id = "0"
+
+        try:
+            while True:
+                # One round-trip returns every entry added since last_id
+                last_id, payloads = await redis_client.read_events(
+                    stream_name,
+                    last_id,
+                    count=STREAM_READ_COUNT,
+                    block_ms=STREAM_BLOCK_MS
+                )
+
+                for data in payloads:
+                    try:
+                        # Raw bytes; orjson parses them without a decode step
+                        try:
+                            parsed_data = orjson.loads(data)
+                        except orjson.JSONDecodeError:
+                            # If not JSON, wrap in standard format
+                            parsed_data = {
+                                "type": "progress_update",
+                                "task_id": task_id,
+                                "message": data.decode('utf-8', errors='replace')
+                            }
+
+                        # Ensure type field exists
+                        if 'type' not in parsed_data:
+                            parsed_data['type'] = 'progress_update'
+
+                        # Ensure task_id field exists
+                        if 'task_id' not in parsed_data:
+                            parsed_data['task_id'] = task_id
+
+                    except Exception as e:
+                        logger.error(f"Error processing Redis message for task {task_id}: {e}")
+                        # Report the error to clients along with their next frame
+                        parsed_data = {
+                            "type": "error",
+                            "message": "Error processing progress update"
+                        }
+
+                    update = (parsed_data, orjson.dumps(parsed_data))
+                    for queue in subscription.queues:
+                        queue.put_latest(update)
+
+        except asyncio.CancelledError:
+            logger.info(f"Redis listener cancelled for task {task_id}")
+            raise
+        except Exception as e:
+            logger.error(f"Error in Redis listener for task {task_id}: {e}")
+
+            # Reader is gone: wake every client so it can close
+            async with self._lock:
+                if self._subscriptions.get(task_id) is subscription:
+                    del self._subscriptions[task_id]
+            for queue in subscription.queues:
+                queue.put_latest(None)
+            await self._close(task_id, subscription)
+
+
+# Global task stream multiplexer
+task_muxer = TaskMuxer()
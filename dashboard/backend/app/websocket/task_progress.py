@@ -1,24 +1,72 @@
 """
 WebSocket handler for real-time task progress updates.
 
-This module provides a WebSocket endpoint that subscribes to Redis Pub/Sub
-channels for specific task IDs and forwards progress messages to connected clients.
+This module provides a WebSocket endpoint that attaches to the shared Redis
+Stream reader for a task ID (see task_muxer) and forwards progress
+messages to connected clients.
 
 Endpoint: /ws/tasks/{task_id}
-Redis Channel: progress:task:{task_id}
+Redis Stream: stream:task:{task_id}
 """
 
 import asyncio
 import json
 import logging
-from typing import Optional
+from typing import List
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 from ..database import get_db_pool
 from ..redis_client import redis_client
+from .frames import encode_batch, send_frame
+from .task_muxer import TaskUpdate, progress_stream, task_muxer
 
 logger = logging.getLogger(__name__)
 
+# Task lookup run on every connect. Kept as one constant so the SQL text is
+# identical on each call and hits asyncpg's per-connection statement cache
+# (parsed and planned once per pooled connection, not once per WebSocket).
+# Elapsed time is computed by Postgres (0 until both timestamps are set).
+TASK_QUERY = """
+    SELECT
+        id, status, error, result,
+        COALESCE(EXTRACT(EPOCH FROM (completed_at - created_at))::int, 0) AS elapsed_seconds
+    FROM dna_app.ai_tasks
+    WHERE id = $1
+"""
+
+# Seconds to collect updates before sending them as one frame
+PROGRESS_COALESCE_WINDOW = 0.02
+
+# Task statuses after which no more progress will arrive
+_TERMINAL = frozenset({'completed', 'failed', 'cancelled'})
+
+# Seconds a finished task's completion message stays cached in Redis
+COMPLETION_CACHE_TTL = 3600
+
+
+def completion_key(task_id: str) -> str:
+    """Redis key caching a finished task's final message (set by the AI worker)."""
+    return f"task:complete:{task_id}"
+
+
+def coalesce_progress(updates: List[TaskUpdate]) -> List[TaskUpdate]:
+    """
+    Drop superseded progress updates from a window of messages.
+
+    Only the latest progress_update is kept; every other message
+    (milestones, completion, errors) passes through in order.
+    """
+    last_progress = None
+    for index, (update, _) in enumerate(updates):
+        if update.get('type') == 'progress_update':
+            last_progress = index
+
+    return [
+        item for index, item in enumerate(updates)
+        if item[0].get('type') != 'progress_update' or index == last_progress
+    ]
+
 
 async def safe_send_json(websocket: WebSocket, data: dict) -> bool:
     """
@@ -40,6 +88,23 @@ async def safe_send_json(websocket: WebSocket, data: dict) -> bool:
         return False
 
 
+async def safe_send_frame(websocket: WebSocket, payload: bytes) -> bool:
+    """
+    Safely send a pre-encoded JSON frame, handling closed connections.
+
+    No state check up front: Starlette raises if the socket is already closed.
+
+    Returns:
+        True if send succeeded, False if connection is closed
+    """
+    try:
+        await send_frame(websocket, payload)
+        return True
+    except Exception as e:
+        logger.debug(f"Failed to send WebSocket frame: {e}")
+        return False
+
+
 async def websocket_endpoint(websocket: WebSocket, task_id: str):
     """
     WebSocket endpoint for task progress updates.
@@ -51,27 +116,39 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
     Flow:
         1. Accept WebSocket connection
         2. Verify task exists in database
-        3. Subscribe to Redis Pub/Sub channel progress:task:{task_id}
+        3. Attach to the shared reader for stream:task:{task_id}
         4. Forward all messages to WebSocket client
         5. Handle disconnection gracefully
     """
     await websocket.accept()
     logger.info(f"WebSocket connected for task {task_id}")
 
-    pubsub = None
-    listener_task = None
-    connection_alive = True
+    updates = None
+    sender_task = None
+    receiver_task = None
 
-    # Verify task exists
+    # Finished tasks: replay the cached completion message without touching Postgres
+    try:
+        cached_completion = await redis_client.get_raw(completion_key(task_id))
+    except Exception as e:
+        logger.warning(f"Failed to read cached completion for task {task_id}: {e}")
+        cached_completion = None
+
+    if cached_completion:
+        await safe_send_frame(websocket, cached_completion)
+        logger.info(f"Task {task_id} already finished, sent cached completion, closing WebSocket")
+        try:
+            await websocket.close()
+        except Exception as e:
+            logger.debug(f"Error closing websocket: {e}")
+        return
+
+    # Verify task exists (one query also covers the completion data)
     try:
         pool = await get_db_pool()
-        async with pool.acquire() as conn:
-            result = await conn.fetchrow(
-                "SELECT id, status FROM dna_app.ai_tasks WHERE id = $1",
-                task_id
-            )
+        full_task = await pool.fetchrow(TASK_QUERY, task_id)
 
-        if not result:
+        if not full_task:
             await safe_send_json(websocket, {
                 "type": "error",
                 "message": f"Task {task_id} not found"
@@ -80,7 +157,7 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
             logger.warning(f"Task {task_id} not found, closing WebSocket")
             return
 
-        task_status = result['status']
+        task_status = full_task['status']
 
         # Send initial task status
         if not await safe_send_json(websocket, {
@@ -91,34 +168,19 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
             logger.warning(f"Failed to send initial status for task {task_id}")
             return
 
-        # If task is already completed/failed/cancelled, fetch full data and send completion
-        if task_status in ['completed', 'failed', 'cancelled']:
-            # Fetch full task data to include elapsed time and result summary
-            async with pool.acquire() as conn:
-                full_task = await conn.fetchrow("""
-                    SELECT
-                        id, status, error,
-                        result, created_at, completed_at
-                    FROM dna_app.ai_tasks
-                    WHERE id = $1
-                """, task_id)
-
-            # Calculate elapsed seconds if we have timestamps
-            elapsed_seconds = 0
-            if full_task and full_task['created_at'] and full_task['completed_at']:
-                elapsed_seconds = int((full_task['completed_at'] - full_task['created_at']).total_seconds())
-
+        # If task is already completed/failed/cancelled, send completion from the same row
+        if task_status in _TERMINAL:
             # Build completion message
             completion_msg = {
                 "type": "task_complete",
                 "task_id": task_id,
                 "status": task_status,
-                "elapsed_seconds": elapsed_seconds,
+                "elapsed_seconds": full_task['elapsed_seconds'],
                 "current_step": "Completed!" if task_status == 'completed' else "Failed"
             }
 
             # Add result_summary if task completed successfully
-            if task_status == 'completed' and full_task and full_task['result']:
+            if task_status == 'completed' and full_task['result']:
                 try:
                     # Result is already JSONB in database, no need to parse
                     result_data = full_task['result']
@@ -128,11 +190,23 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
                     logger.warning(f"Failed to extract result_summary for task {task_id}: {parse_error}")
 
             # Add error details if task failed
-            if task_status == 'failed' and full_task and full_task['error']:
+            if task_status == 'failed' and full_task['error']:
                 completion_msg['error'] = full_task['error']
                 completion_msg['error_type'] = 'task_error'  # Generic type since we don't store error_type
 
-            await safe_send_json(websocket, completion_msg)
+            completion_payload = orjson.dumps(completion_msg)
+            await safe_send_frame(websocket, completion_payload)
+
+            # Cache it so the next connect for this task skips the query
+            try:
+                await redis_client.set_raw(
+                    completion_key(task_id),
+                    completion_payload,
+                    COMPLETION_CACHE_TTL
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache completion for task {task_id}: {e}")
+
             logger.info(f"Task {task_id} already {task_status}, sent full completion data, closing WebSocket")
             await websocket.close()
             return
@@ -149,101 +223,79 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
             pass
         return
 
-    # Subscribe to Redis Pub/Sub channel
-    channel_name = f"progress:task:{task_id}"
+    # Attach to the shared Redis Stream reader for this task
+    stream_name = progress_stream(task_id)
 
     try:
-        # Create Pub/Sub subscription
-        pubsub = redis_client._client.pubsub()
-        await pubsub.subscribe(channel_name)
-        logger.info(f"Subscribed to Redis channel: {channel_name}")
+        updates = await task_muxer.attach(task_id)
 
         # Send subscription confirmation
         if not await safe_send_json(websocket, {
             "type": "subscribed",
             "task_id": task_id,
-            "channel": channel_name
+            "channel": stream_name
         }):
             logger.warning(f"Failed to send subscription confirmation for task {task_id}")
-            connection_alive = False
             return
 
-        # Create listener task for Redis messages
-        async def listen_redis():
-            """Listen for Redis Pub/Sub messages and forward to WebSocket."""
-            nonlocal connection_alive
+        # Forward queued updates, one frame per coalescing window
+        async def send_updates():
+            """Coalesce queued updates and forward them to WebSocket."""
             try:
-                async for message in pubsub.listen():
-                    # Stop if connection is dead
-                    if not connection_alive:
-                        logger.info(f"Connection dead, stopping Redis listener for task {task_id}")
+                while True:
+                    # Wait for the first update, then let the window fill up
+                    window = [await updates.get()]
+                    await asyncio.sleep(PROGRESS_COALESCE_WINDOW)
+                    window.extend(updates.drain())
+
+                    # None means the shared Redis Stream reader failed
+                    subscription_lost = None in window
+
+                    payloads = []
+                    task_finished = False
+                    for update, payload in coalesce_progress([u for u in window if u is not None]):
+                        payloads.append(payload)
+
+                        # If task completed, close connection after this frame
+                        if update.get('type') == 'task_complete' or \
+                           update.get('status') in _TERMINAL:
+                            task_finished = True
+                            break
+
+                    # Tell the client if its queue overflowed so it can re-sync
+                    dropped_frame = updates.take_dropped_frame()
+                    if dropped_frame:
+                        logger.warning(f"Dropped queued updates for slow client on task {task_id}")
+                        payloads.insert(0, dropped_frame)
+
+                    # Forward the whole window as one frame (safely)
+                    if payloads:
+                        if not await safe_send_frame(websocket, encode_batch(payloads)):
+                            logger.warning(f"Failed to send message to client for task {task_id}, stopping sender")
+                            break
+
+                        logger.debug("Forwarded %d message(s) to WebSocket for task %s", len(payloads), task_id)
+
+                    if task_finished:
+                        logger.info(f"Task {task_id} completed, closing WebSocket")
                         break
 
-                    if message['type'] == 'message':
-                        try:
-                            # Parse message data
-                            data = message['data']
-                            if isinstance(data, bytes):
-                                data = data.decode('utf-8')
-
-                            # Try to parse as JSON
-                            try:
-                                parsed_data = json.loads(data)
-                            except json.JSONDecodeError:
-                                # If not JSON, wrap in standard format
-                                parsed_data = {
-                                    "type": "progress_update",
-                                    "task_id": task_id,
-                                    "message": data
-                                }
-
-                            # Ensure type field exists
-                            if 'type' not in parsed_data:
-                                parsed_data['type'] = 'progress_update'
-
-                            # Ensure task_id field exists
-                            if 'task_id' not in parsed_data:
-                                parsed_data['task_id'] = task_id
-
-                            # Forward to WebSocket (safely)
-                            if not await safe_send_json(websocket, parsed_data):
-                                logger.warning(f"Failed to send message to client for task {task_id}, stopping listener")
-                                connection_alive = False
-                                break
-
-                            logger.debug(f"Forwarded message to WebSocket for task {task_id}")
-
-                            # If task completed, close connection
-                            if parsed_data.get('type') == 'task_complete' or \
-                               parsed_data.get('status') in ['completed', 'failed', 'cancelled']:
-                                logger.info(f"Task {task_id} completed, closing WebSocket")
-                                connection_alive = False
-                                break
-
-                        except Exception as e:
-                            logger.error(f"Error processing Redis message for task {task_id}: {e}")
-                            # Try to send error, but don't crash if it fails
-                            await safe_send_json(websocket, {
-                                "type": "error",
-                                "message": "Error processing progress update"
-                            })
+                    if subscription_lost:
+                        logger.warning(f"Redis stream reader lost for task {task_id}, closing WebSocket")
+                        break
 
             except asyncio.CancelledError:
-                logger.info(f"Redis listener cancelled for task {task_id}")
                 raise
             except Exception as e:
-                logger.error(f"Error in Redis listener for task {task_id}: {e}")
-                connection_alive = False
+                logger.error(f"Error sending updates for task {task_id}: {e}")
 
-        # Start Redis listener
-        listener_task = asyncio.create_task(listen_redis())
-
-        # Keep connection alive and handle client messages (ping/pong)
-        try:
-            while connection_alive:
-                # Wait for client message with timeout
-                try:
-                    data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
+        # Handle client messages (ping/pong) until the client goes away.
+        # No receive timeout: the task sleeps until a frame or disconnect arrives.
+        async def receive_client():
+            """Answer client pings and signal disconnect."""
+            try:
+                while True:
+                    data = await websocket.receive_text()
 
                     # Handle ping/pong for keep-alive
                     try:
@@ -253,23 +305,23 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
                                 "type": "pong",
                                 "timestamp": message.get('timestamp')
                             }):
-                                connection_alive = False
                                 break
                     except json.JSONDecodeError:
                         # Ignore non-JSON messages
                         pass
 
-                except asyncio.TimeoutError:
-                    # No message received, continue loop
-                    # This allows checking connection_alive flag
-                    continue
+            except WebSocketDisconnect:
+                logger.info(f"WebSocket disconnected for task {task_id}")
+            except Exception as e:
+                logger.error(f"Error in WebSocket receive loop for task {task_id}: {e}")
 
-        except WebSocketDisconnect:
-            logger.info(f"WebSocket disconnected for task {task_id}")
-            connection_alive = False
-        except Exception as e:
-            logger.error(f"Error in WebSocket receive loop for task {task_id}: {e}")
-            connection_alive = False
+        # Start sender and client receiver; the connection ends when either returns
+        sender_task = asyncio.create_task(send_updates())
+        receiver_task = asyncio.create_task(receive_client())
+        await asyncio.wait(
+            {sender_task, receiver_task},
+            return_when=asyncio.FIRST_COMPLETED
+        )
 
     except Exception as e:
         logger.error(f"Error in WebSocket handler for task {task_id}: {e}")
@@ -279,25 +331,18 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         })
 
     finally:
-        # Mark connection as dead
-        connection_alive = False
-
-        # Cleanup Redis listener
-        if listener_task:
-            listener_task.cancel()
-            try:
-                await listener_task
-            except asyncio.CancelledError:
-                pass
+        # Cleanup sender and client receiver (whichever is still running)
+        for task in (sender_task, receiver_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
-        # Cleanup Redis subscription
-        if pubsub:
-            try:
-                await pubsub.unsubscribe(channel_name)
-                await pubsub.close()
-                logger.info(f"Unsubscribed from Redis channel: {channel_name}")
-            except Exception as e:
-                logger.error(f"Error unsubscribing from Redis: {e}")
+        # Release the shared Redis Stream reader
+        if updates is not None:
+            await task_muxer.detach(task_id, updates)
 
         # Close WebSocket
         try:
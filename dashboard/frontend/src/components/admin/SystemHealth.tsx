@@ -106,6 +106,7 @@ export default function SystemHealth() {
       console.log("Connecting to System Health WebSocket:", wsUrl);
 
       const ws = new WebSocket(wsUrl);
+      ws.binaryType = "arraybuffer"; // Server sends pre-encoded JSON as binary frames
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -114,42 +115,60 @@ export default function SystemHealth() {
         reconnectDelayRef.current = 3000; // Reset delay on successful connection
       };
 
+      const handleMessage = (data: any) => {
+        if (data.type === "subscribed") {
+          console.log("Subscribed to health channel:", data.channel);
+          return;
+        }
+
+        if (data.type === "pong") {
+          return; // Ignore pong messages
+        }
+
+        if (data.type === "dropped") {
+          // Server shed alerts we were too slow to receive; statuses catch up on the next alert
+          console.warn(`System health dropped ${data.count} queued alert(s)`);
+          return;
+        }
+
+        // Handle health alert
+        const alert: HealthAlert = {
+          component: data.component,
+          status: data.status,
+          message: data.message,
+          severity: data.severity,
+          timestamp: data.timestamp,
+          metadata: data.metadata,
+        };
+
+        // Update component status
+        setComponentStatuses((prev) => ({
+          ...prev,
+          [alert.component]: {
+            status: alert.status,
+            severity: alert.severity,
+            message: alert.message,
+            lastUpdate: alert.timestamp,
+          },
+        }));
+
+        // Add to alerts list (keep last 50)
+        setAlerts((prev) => [alert, ...prev].slice(0, 50));
+      };
+
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const raw =
+            typeof event.data === "string" ? event.data : new TextDecoder().decode(event.data);
+          const data = JSON.parse(raw);
 
-          if (data.type === "subscribed") {
-            console.log("Subscribed to health channel:", data.channel);
+          // Batched frames carry several messages at once
+          if (data.type === "startup_batch" || data.type === "batch") {
+            data.messages.forEach(handleMessage);
             return;
           }
 
-          if (data.type === "pong") {
-            return; // Ignore pong messages
-          }
-
-          // Handle health alert
-          const alert: HealthAlert = {
-            component: data.component,
-            status: data.status,
-            message: data.message,
-            severity: data.severity,
-            timestamp: data.timestamp,
-            metadata: data.metadata,
-          };
-
-          // Update component status
-          setComponentStatuses((prev) => ({
-            ...prev,
-            [alert.component]: {
-              status: alert.status,
-              severity: alert.severity,
-              message: alert.message,
-              lastUpdate: alert.timestamp,
-            },
-          }));
-
-          // Add to alerts list (keep last 50)
-          setAlerts((prev) => [alert, ...prev].slice(0, 50));
+          handleMessage(data);
         } catch (error) {
           console.error("Error parsing health message:", error);
         }
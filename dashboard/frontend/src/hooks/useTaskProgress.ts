@@ -84,6 +84,7 @@ export function useTaskProgress(
       console.log(`[useTaskProgress] Connecting to ${wsUrl}`);
 
       const ws = new WebSocket(wsUrl);
+      ws.binaryType = 'arraybuffer'; // Server sends pre-encoded JSON as binary frames
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -108,86 +109,97 @@ export function useTaskProgress(
         }, 30000);
       };
 
+      const handleMessage = (data: any) => {
+        const messageType = data.type;
+
+        if (messageType === 'task_status') {
+          // Initial task status
+          setProgress((prev) => ({
+            ...prev,
+            status: data.status as TaskProgress['status'],
+            progress: data.progress || 0,
+            currentStep: data.current_step || prev.currentStep,
+          }));
+        } else if (messageType === 'subscribed') {
+          // Subscription confirmation
+          console.log(`[useTaskProgress] Subscribed to ${data.channel}`);
+        } else if (messageType === 'pong') {
+          // Heartbeat pong response
+          console.log('[useTaskProgress] Received pong');
+        } else if (messageType === 'dropped') {
+          // Server shed queued updates; the next progress_update carries the latest state
+          console.warn(`[useTaskProgress] Server dropped ${data.count} queued update(s)`);
+        } else if (messageType === 'progress_update') {
+          // Progress update with ETA
+          setProgress((prev) => ({
+            ...prev,
+            progress: data.progress || prev.progress,
+            currentStep: data.current_step || prev.currentStep,
+            etaSeconds: data.eta_seconds ?? prev.etaSeconds,
+            etaMessage: data.eta_message ?? prev.etaMessage,
+            elapsedSeconds: data.elapsed_seconds || prev.elapsedSeconds,
+            status: 'processing',
+            error: null,
+            errorType: null,
+          }));
+        } else if (messageType === 'milestone') {
+          // Major milestone reached
+          console.log(`[useTaskProgress] Milestone: ${data.milestone}`);
+          setProgress((prev) => ({
+            ...prev,
+            currentStep: data.milestone,
+          }));
+        } else if (messageType === 'task_complete') {
+          // Task completed successfully
+          isTerminalStateRef.current = true; // Mark as terminal state
+          setProgress({
+            progress: 100,
+            currentStep: data.current_step || 'Completed!',
+            etaSeconds: null,
+            etaMessage: null,
+            elapsedSeconds: data.elapsed_seconds || 0,
+            status: 'completed',
+            error: null,
+            errorType: null,
+            resultSummary: data.result_summary || null,
+          });
+
+          // Close WebSocket after completion
+          setTimeout(() => {
+            ws.close();
+          }, 1000);
+        } else if (messageType === 'task_error') {
+          // Task failed with error
+          isTerminalStateRef.current = true; // Mark as terminal state
+          setProgress({
+            progress: 0,
+            currentStep: 'Failed',
+            etaSeconds: null,
+            etaMessage: null,
+            elapsedSeconds: data.elapsed_seconds || 0,
+            status: 'failed',
+            error: data.error || 'Unknown error',
+            errorType: data.error_type || 'unknown',
+            resultSummary: null,
+          });
+
+          // Close WebSocket after error
+          setTimeout(() => {
+            ws.close();
+          }, 1000);
+        }
+      };
+
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const raw =
+            typeof event.data === 'string' ? event.data : new TextDecoder().decode(event.data);
+          const data = JSON.parse(raw);
           console.log(`[useTaskProgress] Received:`, data);
 
-          const messageType = data.type;
-
-          if (messageType === 'task_status') {
-            // Initial task status
-            setProgress((prev) => ({
-              ...prev,
-              status: data.status as TaskProgress['status'],
-              progress: data.progress || 0,
-              currentStep: data.current_step || prev.currentStep,
-            }));
-          } else if (messageType === 'subscribed') {
-            // Subscription confirmation
-            console.log(`[useTaskProgress] Subscribed to ${data.channel}`);
-          } else if (messageType === 'pong') {
-            // Heartbeat pong response
-            console.log('[useTaskProgress] Received pong');
-          } else if (messageType === 'progress_update') {
-            // Progress update with ETA
-            setProgress((prev) => ({
-              ...prev,
-              progress: data.progress || prev.progress,
-              currentStep: data.current_step || prev.currentStep,
-              etaSeconds: data.eta_seconds ?? prev.etaSeconds,
-              etaMessage: data.eta_message ?? prev.etaMessage,
-              elapsedSeconds: data.elapsed_seconds || prev.elapsedSeconds,
-              status: 'processing',
-              error: null,
-              errorType: null,
-            }));
-          } else if (messageType === 'milestone') {
-            // Major milestone reached
-            console.log(`[useTaskProgress] Milestone: ${data.milestone}`);
-            setProgress((prev) => ({
-              ...prev,
-              currentStep: data.milestone,
-            }));
-          } else if (messageType === 'task_complete') {
-            // Task completed successfully
-            isTerminalStateRef.current = true; // Mark as terminal state
-            setProgress({
-              progress: 100,
-              currentStep: data.current_step || 'Completed!',
-              etaSeconds: null,
-              etaMessage: null,
-              elapsedSeconds: data.elapsed_seconds || 0,
-              status: 'completed',
-              error: null,
-              errorType: null,
-              resultSummary: data.result_summary || null,
-            });
-
-            // Close WebSocket after completion
-            setTimeout(() => {
-              ws.close();
-            }, 1000);
-          } else if (messageType === 'task_error') {
-            // Task failed with error
-            isTerminalStateRef.current = true; // Mark as terminal state
-            setProgress({
-              progress: 0,
-              currentStep: 'Failed',
-              etaSeconds: null,
-              etaMessage: null,
-              elapsedSeconds: data.elapsed_seconds || 0,
-              status: 'failed',
-              error: data.error || 'Unknown error',
-              errorType: data.error_type || 'unknown',
-              resultSummary: null,
-            });
-
-            // Close WebSocket after error
-            setTimeout(() => {
-              ws.close();
-            }, 1000);
-          }
+          // Batched frames carry several messages at once
+          const messages = data.type === 'batch' ? data.messages : [data];
+          messages.forEach(handleMessage);
         } catch (err) {
           console.error('[useTaskProgress] Failed to parse message:', err);
         }
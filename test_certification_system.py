@@ -7,39 +7,152 @@ Comprehensive tests for the new certification management features:
 - Intelligent document generation
 
 Run with: python test_certification_system.py
+Requires: pip install 'httpx[http2]' orjson
 """
 
-import requests
+import asyncio
+import base64
+import httpx
 import json
+import orjson
+import os
+import pathlib
+import tempfile
+import time
 from datetime import datetime
 
 # Configuration
 BASE_URL = "http://localhost:8400/api"
 AUTH_URL = "http://localhost:8401"
 
+# Endpoint paths, built once (relative to BASE_URL on the shared client)
+URL_LOGIN = f"{AUTH_URL}/auth/login"
+URL_CUSTOMERS = "/customers"
+URL_CERTS = "/certifications"
+URL_TEMPLATES = "/templates"
+URL_DOCUMENTS = f"{URL_TEMPLATES}/documents"
+URL_GENERATE = f"{URL_DOCUMENTS}/generate-from-text"
+
 # Test credentials (adjust based on your setup)
 TEST_USER = {
     "username": "admin",
     "password": "admin123"
 }
 
+# Connection pool for the shared client: keep-alive connections are reused
+# across requests, and independent calls run concurrently (multiplexed on one
+# connection when the server negotiates HTTP/2)
+CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Per-request timeouts: fail fast on connect, allow slow reads.
+# Document generation runs an LLM and gets a longer read timeout.
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=3.05)
+GENERATION_TIMEOUT = httpx.Timeout(120.0, connect=3.05)
+
+# Characters of the filled document shown in previews
+PREVIEW_CHARS = 500
+
+# Most bytes read from a preview response before giving up on it
+PREVIEW_MAX_BYTES = 64 * 1024
+
+# Sample customer description used for document generation
+_DESCRIPTION = """
+    Our company, Test Corporation Inc., is a software development firm specializing 
+    in cloud-based financial applications. We have 50 employees and operate from 
+    our headquarters in Test City. Our main operations involve:
+    
+    - Developing secure payment processing systems
+    - Cloud infrastructure management using AWS
+    - Regular security audits and penetration testing
+    - 24/7 system monitoring and incident response
+    
+    For patch management, we currently use automated tools to deploy security patches
+    on a monthly schedule. Critical patches are deployed within 48 hours. We maintain
+    detailed logs of all patch activities and have a rollback procedure in case of issues.
+    
+    Our approval process involves review by the IT Security Manager (John Smith) and 
+    final approval by the CTO (Jane Doe). All patches are tested in our staging environment
+    before production deployment.
+    """
+
+# Generation request body; template_id and customer_id are filled in per call
+_GEN_DATA_TEMPLATE = {
+    "template_id": None,
+    "customer_id": None,
+    "customer_certification_id": 1,  # Assuming ID 1
+    "description": _DESCRIPTION
+}
+
+# Request bodies are encoded with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
-def get_auth_token():
-    """Authenticate and get JWT token."""
-    response = requests.post(
-        f"{AUTH_URL}/auth/login",
-        json=TEST_USER
+# JWT reused across runs until it is about to expire
+_token_cache_path = pathlib.Path(tempfile.gettempdir()) / "dna_test_token.json"
+TOKEN_MIN_REMAINING_SECONDS = 60
+
+
+def _token_expiry(token):
+    """Read the exp claim from a JWT payload (no signature check needed here)."""
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["exp"]
+
+
+def _load_cached_token():
+    """Return the cached token if it is still valid for a while, else None."""
+    try:
+        cached = json.loads(_token_cache_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if cached.get("exp", 0) - time.time() > TOKEN_MIN_REMAINING_SECONDS:
+        return cached.get("token")
+    return None
+
+
+def _save_cached_token(token):
+    """Write the token cache atomically so a concurrent run never reads half a file."""
+    try:
+        tmp_path = _token_cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"token": token, "exp": _token_expiry(token)}))
+        os.replace(tmp_path, _token_cache_path)
+    except (OSError, ValueError, KeyError, IndexError):
+        pass
+
+
+def _send_json(client, method, url, payload, **kwargs):
+    """Send a JSON body encoded with orjson (faster than httpx's json= for large payloads)."""
+    return client.request(
+        method,
+        url,
+        content=orjson.dumps(payload),
+        headers=_JSON_HEADERS,
+        **kwargs
+    )
+
+
+async def get_auth_token(client):
+    """Authenticate and get JWT token (cached on disk between runs)."""
+    token = _load_cached_token()
+    if token:
+        return token
+
+    response = await _send_json(
+        client, "POST",
+        URL_LOGIN,
+        TEST_USER
     )
     if response.status_code == 200:
-        return response.json()["access_token"]
+        token = orjson.loads(response.content)["access_token"]
+        _save_cached_token(token)
+        return token
     else:
         raise Exception(f"Authentication failed: {response.text}")
 
 
-def test_customer_crud(token):
+async def test_customer_crud(client):
     """Test customer CRUD operations."""
     print("\n=== Testing Customer CRUD ===")
-    headers = {"Authorization": f"Bearer {token}"}
     
     # 1. Create customer
     print("\n1. Creating test customer...")
@@ -52,14 +165,14 @@ def test_customer_crud(token):
         "notes": "Test customer for certification system"
     }
     
-    response = requests.post(
-        f"{BASE_URL}/customers",
-        headers=headers,
-        json=customer_data
+    response = await _send_json(
+        client, "POST",
+        URL_CUSTOMERS,
+        customer_data
     )
     
     if response.status_code == 201:
-        customer = response.json()
+        customer = orjson.loads(response.content)
         print(f"✅ Customer created: ID={customer['id']}, Name={customer['name']}")
         customer_id = customer['id']
     else:
@@ -68,45 +181,31 @@ def test_customer_crud(token):
     
     # 2. Get customer
     print(f"\n2. Retrieving customer {customer_id}...")
-    response = requests.get(
-        f"{BASE_URL}/customers/{customer_id}",
-        headers=headers
+    response = await client.get(
+        f"{URL_CUSTOMERS}/{customer_id}"
     )
     
     if response.status_code == 200:
-        customer = response.json()
+        customer = orjson.loads(response.content)
         print(f"✅ Customer retrieved: {customer['name']}")
     else:
         print(f"❌ Failed to retrieve customer: {response.text}")
     
-    # 3. List all customers
-    print("\n3. Listing all customers...")
-    response = requests.get(
-        f"{BASE_URL}/customers",
-        headers=headers
-    )
-    
-    if response.status_code == 200:
-        customers = response.json()
-        print(f"✅ Found {len(customers)} customers")
-    else:
-        print(f"❌ Failed to list customers: {response.text}")
-    
-    # 4. Update customer
-    print(f"\n4. Updating customer {customer_id}...")
+    # 3. Update customer
+    print(f"\n3. Updating customer {customer_id}...")
     update_data = {
         "business_area": "Financial Technology",
         "notes": "Updated business area to FinTech"
     }
     
-    response = requests.put(
-        f"{BASE_URL}/customers/{customer_id}",
-        headers=headers,
-        json=update_data
+    response = await _send_json(
+        client, "PUT",
+        f"{URL_CUSTOMERS}/{customer_id}",
+        update_data
     )
     
     if response.status_code == 200:
-        updated = response.json()
+        updated = orjson.loads(response.content)
         print(f"✅ Customer updated: Business Area={updated['business_area']}")
     else:
         print(f"❌ Failed to update customer: {response.text}")
@@ -114,78 +213,92 @@ def test_customer_crud(token):
     return customer_id
 
 
-def test_certification_listing(token):
-    """Test certification listing."""
-    print("\n=== Testing Certification Listing ===")
-    headers = {"Authorization": f"Bearer {token}"}
+async def test_customer_listing(client):
+    """Test customer listing."""
+    response = await client.get(
+        URL_CUSTOMERS
+    )
     
-    response = requests.get(
-        f"{BASE_URL}/certifications",
-        headers=headers
+    # Header printed with the result so concurrent listings don't interleave
+    print("\n=== Testing Customer Listing ===")
+    if response.status_code == 200:
+        customers = orjson.loads(response.content)
+        print(f"✅ Found {len(customers)} customers")
+        return customers
+    else:
+        print(f"❌ Failed to list customers: {response.text}")
+        return []
+
+
+async def test_certification_listing(client):
+    """Test certification listing."""
+    response = await client.get(
+        URL_CERTS
     )
     
+    print("\n=== Testing Certification Listing ===")
     if response.status_code == 200:
-        certifications = response.json()
-        print(f"✅ Found {len(certifications)} available certifications:")
-        for cert in certifications:
-            print(f"   - {cert['name']} ({cert['code']})")
+        certifications = orjson.loads(response.content)
+        lines = [f"✅ Found {len(certifications)} available certifications:"]
+        lines.extend(f"   - {cert['name']} ({cert['code']})" for cert in certifications)
+        print("\n".join(lines))
         return certifications
     else:
         print(f"❌ Failed to list certifications: {response.text}")
         return []
 
 
-def test_template_listing(token):
+async def test_template_listing(client):
     """Test template listing."""
-    print("\n=== Testing Template Listing ===")
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    response = requests.get(
-        f"{BASE_URL}/templates",
-        headers=headers
+    response = await client.get(
+        URL_TEMPLATES
     )
     
+    print("\n=== Testing Template Listing ===")
     if response.status_code == 200:
-        templates = response.json()
-        print(f"✅ Found {len(templates)} templates")
+        templates = orjson.loads(response.content)
+        lines = [f"✅ Found {len(templates)} templates"]
         if templates:
-            for template in templates:
-                print(f"   - {template['name']} (Type: {template['document_type']})")
+            lines.extend(
+                f"   - {template['name']} (Type: {template['document_type']})"
+                for template in templates
+            )
         else:
-            print("   ℹ️  No templates uploaded yet")
+            lines.append("   ℹ️  No templates uploaded yet")
+        print("\n".join(lines))
         return templates
     else:
         print(f"❌ Failed to list templates: {response.text}")
         return []
 
 
-def test_interview_questions(token, template_id):
+async def test_interview_questions(client, template_id):
     """Test interview question generation."""
     print(f"\n=== Testing Interview Question Generation (Template {template_id}) ===")
-    headers = {"Authorization": f"Bearer {token}"}
     
-    response = requests.get(
-        f"{BASE_URL}/templates/{template_id}/interview-questions",
-        headers=headers
+    response = await client.get(
+        f"{URL_TEMPLATES}/{template_id}/interview-questions"
     )
     
     if response.status_code == 200:
-        result = response.json()
-        print(f"✅ Generated {result['total_questions']} questions:")
+        result = orjson.loads(response.content)
+        # One print for the whole block instead of one per line
+        lines = [f"✅ Generated {result['total_questions']} questions:"]
         for i, question in enumerate(result['questions'][:5], 1):  # Show first 5
-            print(f"   {i}. {question['question']}")
-            if 'field_name' in question:
-                print(f"      → For field: {question['field_name']}")
+            lines.append(f"   {i}. {question['question']}")
+            field_name = question.get('field_name')
+            if field_name:
+                lines.append(f"      → For field: {field_name}")
+        print("\n".join(lines))
         return result['questions']
     else:
         print(f"❌ Failed to generate questions: {response.text}")
         return []
 
 
-def test_document_generation_from_text(token, customer_id, template_id):
+async def test_document_generation_from_text(client, customer_id, template_id):
     """Test document generation from free text."""
     print(f"\n=== Testing Document Generation from Free Text ===")
-    headers = {"Authorization": f"Bearer {token}"}
     
     # First, create a customer certification record
     print("\n1. Creating customer certification record...")
@@ -199,42 +312,20 @@ def test_document_generation_from_text(token, customer_id, template_id):
     # Note: You'll need to add this endpoint or create it manually
     # For now, let's assume certification_id = 1 exists
     
-    # Sample customer description
-    description = """
-    Our company, Test Corporation Inc., is a software development firm specializing 
-    in cloud-based financial applications. We have 50 employees and operate from 
-    our headquarters in Test City. Our main operations involve:
-    
-    - Developing secure payment processing systems
-    - Cloud infrastructure management using AWS
-    - Regular security audits and penetration testing
-    - 24/7 system monitoring and incident response
-    
-    For patch management, we currently use automated tools to deploy security patches
-    on a monthly schedule. Critical patches are deployed within 48 hours. We maintain
-    detailed logs of all patch activities and have a rollback procedure in case of issues.
-    
-    Our approval process involves review by the IT Security Manager (John Smith) and 
-    final approval by the CTO (Jane Doe). All patches are tested in our staging environment
-    before production deployment.
-    """
-    
     print("\n2. Generating document from customer description...")
-    gen_data = {
-        "template_id": template_id,
-        "customer_id": customer_id,
-        "customer_certification_id": 1,  # Assuming ID 1
-        "description": description
-    }
-    
-    response = requests.post(
-        f"{BASE_URL}/templates/documents/generate-from-text",
-        headers=headers,
-        json=gen_data
+    gen_data = _GEN_DATA_TEMPLATE.copy()
+    gen_data["template_id"] = template_id
+    gen_data["customer_id"] = customer_id
+    
+    response = await _send_json(
+        client, "POST",
+        URL_GENERATE,
+        gen_data,
+        timeout=GENERATION_TIMEOUT
     )
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"✅ Document generated successfully!")
         print(f"   - Document ID: {result['document_id']}")
         print(f"   - Completion: {result['completion_percentage']}%")
@@ -246,44 +337,54 @@ def test_document_generation_from_text(token, customer_id, template_id):
         return None
 
 
-def test_document_preview(token, document_id):
+async def test_document_preview(client, document_id):
     """Test document preview."""
     print(f"\n=== Testing Document Preview (Document {document_id}) ===")
-    headers = {"Authorization": f"Bearer {token}"}
     
-    response = requests.get(
-        f"{BASE_URL}/templates/documents/{document_id}/preview",
-        headers=headers
-    )
+    # Server truncates the document; the body is streamed and capped so a
+    # server that ignores preview_chars can't make us buffer the whole file
+    async with client.stream(
+        "GET",
+        f"{URL_DOCUMENTS}/{document_id}/preview",
+        params={"preview_chars": PREVIEW_CHARS}
+    ) as response:
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > PREVIEW_MAX_BYTES:
+                break
+    
+    if len(body) > PREVIEW_MAX_BYTES:
+        print(f"❌ Preview response exceeded {PREVIEW_MAX_BYTES} bytes (not truncated by server)")
+        return None
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(body)
         print(f"✅ Document preview generated!")
         print(f"   - Template: {result['template_name']}")
         print(f"   - Completion: {result['completion_percentage']}%")
         print(f"   - Complete: {'Yes' if result['is_complete'] else 'No'}")
         
-        if result['missing_required_fields']:
-            print(f"   - Missing required fields: {len(result['missing_required_fields'])}")
-            for field in result['missing_required_fields']:
-                print(f"      • {field['label']}")
+        missing_fields = result['missing_required_fields']
+        if missing_fields:
+            lines = [f"   - Missing required fields: {len(missing_fields)}"]
+            lines.extend(f"      • {field['label']}" for field in missing_fields)
+            print("\n".join(lines))
         
-        # Show first 500 characters of filled document
+        # Show the (server-truncated) start of the filled document
         if 'filled_document' in result:
-            preview_text = result['filled_document'][:500]
-            print(f"\n   Preview (first 500 chars):")
-            print(f"   {preview_text}...")
+            print(f"\n   Preview (first {PREVIEW_CHARS} of {result['total_length']} chars):")
+            print(f"   {result['filled_document']}{'...' if result['truncated'] else ''}")
         
         return result
     else:
-        print(f"❌ Failed to preview document: {response.text}")
+        print(f"❌ Failed to preview document: {body.decode('utf-8', errors='replace')}")
         return None
 
 
-def test_document_refinement(token, document_id):
+async def test_document_refinement(client, document_id):
     """Test document refinement with feedback."""
     print(f"\n=== Testing Document Refinement (Document {document_id}) ===")
-    headers = {"Authorization": f"Bearer {token}"}
     
     feedback = """
     Please update the following:
@@ -292,72 +393,85 @@ def test_document_refinement(token, document_id):
     3. Update the approval timeframe for critical patches to 24 hours
     """
     
-    response = requests.put(
-        f"{BASE_URL}/templates/documents/{document_id}/refine",
-        headers=headers,
-        json={"feedback": feedback}
+    # include=preview returns the refined document too, so no follow-up preview call
+    response = await _send_json(
+        client, "PUT",
+        f"{URL_DOCUMENTS}/{document_id}/refine",
+        {"feedback": feedback},
+        params={"include": "preview"}
     )
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"✅ Document refined successfully!")
         print(f"   - New Version: {result['version']}")
         print(f"   - Completion: {result['completion_percentage']}%")
         print(f"   - Changes Applied: {result['changes_applied']}")
+        
+        # Show the start of the refined document
+        if 'filled_document' in result:
+            preview_text = result['filled_document'][:PREVIEW_CHARS]
+            print(f"\n   Refined preview (first {PREVIEW_CHARS} chars):")
+            print(f"   {preview_text}...")
+        
         return result
     else:
         print(f"❌ Failed to refine document: {response.text}")
         return None
 
 
-def main():
+async def main():
     """Run all tests."""
     print("=" * 70)
     print("DNA CERTIFICATION SYSTEM - COMPREHENSIVE TEST SUITE")
     print("=" * 70)
     
+    client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        limits=CLIENT_LIMITS,
+        http2=True,
+        timeout=DEFAULT_TIMEOUT
+    )
+    
     try:
         # Get authentication token
         print("\n🔐 Authenticating...")
-        token = get_auth_token()
+        token = await get_auth_token(client)
+        client.headers["Authorization"] = f"Bearer {token}"
         print("✅ Authentication successful")
         
         # Test customer CRUD
-        customer_id = test_customer_crud(token)
+        customer_id = await test_customer_crud(client)
         
         if not customer_id:
             print("\n⚠️  Cannot proceed without customer. Exiting.")
             return
         
-        # Test certification listing
-        certifications = test_certification_listing(token)
-        
-        # Test template listing
-        templates = test_template_listing(token)
+        # Independent listings run concurrently
+        certifications, templates, _ = await asyncio.gather(
+            test_certification_listing(client),
+            test_template_listing(client),
+            test_customer_listing(client)
+        )
         
         # If templates exist, test document generation
         if templates:
             template_id = templates[0]['id']
             
             # Test interview questions
-            questions = test_interview_questions(token, template_id)
+            questions = await test_interview_questions(client, template_id)
             
             # Test document generation
-            document_id = test_document_generation_from_text(
-                token, customer_id, template_id
+            document_id = await test_document_generation_from_text(
+                client, customer_id, template_id
             )
             
             if document_id:
                 # Test document preview
-                preview = test_document_preview(token, document_id)
-                
-                # Test document refinement
-                refinement = test_document_refinement(token, document_id)
+                preview = await test_document_preview(client, document_id)
                 
-                # Preview again after refinement
-                if refinement:
-                    print("\n📄 Previewing refined document...")
-                    test_document_preview(token, document_id)
+                # Test document refinement (response includes the refined preview)
+                refinement = await test_document_refinement(client, document_id)
         else:
             print("\n⚠️  No templates available for document generation tests")
             print("   To test document generation:")
@@ -373,6 +487,9 @@ def main():
         import traceback
         traceback.print_exc()
 
+    finally:
+        await client.aclose()
+
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
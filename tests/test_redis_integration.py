@@ -5,33 +5,110 @@ Tests for Redis connection, Streams, and Pub/Sub functionality
 import pytest
 import asyncio
 import json
-from datetime import datetime
-import sys
 import os
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import orjson
 
 from dashboard.backend.app.redis_client import RedisClient
 
 
-@pytest.fixture
+# Test stream name, encoded once; the client returns it decoded
+_STREAM = b'test:stream'
+_STREAM_STR = 'test:stream'
+
+# Any timestamp string will do for test payloads
+_FIXED_TS = "2024-01-01T00:00:00"
+
+# Messages for the max-length test, built once at import
+MAX_LEN_PAYLOADS = [{'count': i} for i in range(10)]
+
+# Pipelining regression gate: N adds, pipelined must beat sequential by this factor
+PERF_ADDS = 200
+PERF_MIN_SPEEDUP = 3
+PERF_PAYLOADS = [{'count': i} for i in range(PERF_ADDS)]
+
+# Logical databases on a default Redis server
+REDIS_DB_COUNT = 16
+
+# Background pub/sub teardown tasks, awaited once at session end
+_pending_closes = []
+
+
+def _worker_db():
+    """Redis DB for this pytest-xdist worker (gw0 -> 0, gw1 -> 1, ...)"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    return int(worker[2:]) % REDIS_DB_COUNT
+
+
+@pytest.fixture(scope="session")
 async def redis_client():
-    """Create a Redis client for testing"""
-    client = RedisClient()
+    """
+    Create one Redis client (and connection pool) shared by every test.
+    Each xdist worker gets its own logical DB, so stream keys never collide.
+    """
+    client = RedisClient(db=_worker_db())
     await client.connect()
     yield client
+    # Let background pub/sub teardown finish before closing its connection
+    await asyncio.gather(*_pending_closes, return_exceptions=True)
+    _pending_closes.clear()
     await client.disconnect()
 
 
 @pytest.fixture
-async def clean_redis(redis_client):
-    """Clean up Redis streams and channels before/after tests"""
-    # Clean up before test
-    await redis_client.redis.delete('test:stream')
+async def clean_redis(request, redis_client):
+    """
+    Clean up Redis streams and channels before/after tests.
+    
+    Tests can seed test:stream by parametrizing this fixture indirectly
+    with a list of messages; the cleanup and the seeding share one round-trip.
+    """
+    seed_messages = getattr(request, 'param', [])
+    
+    # Clean up (and seed) before test
+    async with redis_client.redis.pipeline(transaction=False) as pipe:
+        pipe.delete(_STREAM)
+        for message in seed_messages:
+            pipe.xadd(_STREAM, message)
+        await pipe.execute()
     yield redis_client
     # Clean up after test
-    await redis_client.redis.delete('test:stream')
+    await redis_client.redis.delete(_STREAM)
+
+
+# Channels the shared subscriber listens on (exact names, no patterns)
+PUBSUB_TEST_CHANNELS = ['test:progress:channel']
+
+
+@pytest.fixture(scope="class")
+async def shared_pubsub(redis_client):
+    """
+    One subscriber for a whole test class. A background task reads the
+    connection and routes each message into a queue for its channel.
+    
+    Yields:
+        (pubsub, {channel: asyncio.Queue})
+    """
+    pubsub = await redis_client.subscribe(*PUBSUB_TEST_CHANNELS)
+    queues = {channel: asyncio.Queue() for channel in PUBSUB_TEST_CHANNELS}
+    
+    async def route_messages():
+        async for message in pubsub.listen():
+            if message['type'] == 'message':
+                queues[message['channel']].put_nowait(message)
+    
+    router = asyncio.create_task(route_messages())
+    yield pubsub, queues
+    
+    router.cancel()
+    try:
+        await router
+    except asyncio.CancelledError:
+        pass
+    # Unsubscribe in the background so the next test doesn't wait on it
+    _pending_closes.append(
+        asyncio.create_task(redis_client.unsubscribe(*PUBSUB_TEST_CHANNELS))
+    )
 
 
 class TestRedisConnection:
@@ -61,10 +138,10 @@ class TestRedisStreams:
         test_data = {
             'task_id': 'test-uuid-123',
             'task_type': 'template_parse',
-            'created_at': datetime.utcnow().isoformat()
+            'created_at': _FIXED_TS
         }
         
-        message_id = await clean_redis.add_to_stream('test:stream', test_data)
+        message_id = await clean_redis.add_to_stream(_STREAM, test_data)
         assert message_id is not None, "Message ID should not be None"
         assert isinstance(message_id, str), "Message ID should be string"
     
@@ -73,27 +150,30 @@ class TestRedisStreams:
         """Test reading messages from Redis Stream"""
         # Add test message
         test_data = {'message': 'test', 'value': 42}
-        await clean_redis.add_to_stream('test:stream', test_data)
+        await clean_redis.add_to_stream(_STREAM, test_data)
         
         # Read messages
-        messages = await clean_redis.read_stream('test:stream', count=10)
+        messages = await clean_redis.read_stream(_STREAM, count=10, block_ms=100)
         assert messages is not None, "Messages should not be None"
         assert len(messages) > 0, "Should have at least one message"
         
         # Verify message structure
         stream_name, message_list = messages[0]
-        assert stream_name == b'test:stream', "Stream name should match"
+        assert stream_name == _STREAM_STR, "Stream name should match"
         assert len(message_list) > 0, "Message list should not be empty"
+        
+        # Whole payload travels as one JSON field
+        _, fields = message_list[0]
+        assert orjson.loads(fields['data']) == test_data, "Payload should round-trip"
     
     @pytest.mark.asyncio
+    # Seeded with one message by clean_redis, in the same round-trip as the cleanup
+    @pytest.mark.parametrize('clean_redis', [[{'init': 'message'}]], indirect=True)
     async def test_create_consumer_group(self, clean_redis):
         """Test creating consumer group for stream"""
-        # Add a message first
-        await clean_redis.add_to_stream('test:stream', {'init': 'message'})
-        
         # Create consumer group
         result = await clean_redis.create_consumer_group(
-            'test:stream', 
+            _STREAM, 
             'test-group', 
             '0'
         )
@@ -101,7 +181,7 @@ class TestRedisStreams:
         
         # Try creating again (should handle BUSYGROUP error)
         result = await clean_redis.create_consumer_group(
-            'test:stream', 
+            _STREAM, 
             'test-group', 
             '0'
         )
@@ -111,35 +191,61 @@ class TestRedisStreams:
     async def test_get_stream_length(self, clean_redis):
         """Test getting stream length"""
         # Initially empty
-        length = await clean_redis.get_stream_length('test:stream')
+        length = await clean_redis.get_stream_length(_STREAM)
         initial_length = length
         
-        # Add messages
-        await clean_redis.add_to_stream('test:stream', {'msg': '1'})
-        await clean_redis.add_to_stream('test:stream', {'msg': '2'})
-        await clean_redis.add_to_stream('test:stream', {'msg': '3'})
+        # Add messages (one pipelined round-trip)
+        await clean_redis.add_many_to_stream(
+            _STREAM,
+            [{'msg': '1'}, {'msg': '2'}, {'msg': '3'}]
+        )
         
         # Check length
-        length = await clean_redis.get_stream_length('test:stream')
+        length = await clean_redis.get_stream_length(_STREAM)
         assert length == initial_length + 3, "Stream should have 3 new messages"
     
     @pytest.mark.asyncio
+    # clean_redis creates the stream, so every add below can skip creation
+    @pytest.mark.parametrize('clean_redis', [[{'init': 'message'}]], indirect=True)
     async def test_stream_max_length(self, clean_redis):
         """Test stream respects max length"""
         max_len = 5
         
-        # Add more messages than max_len
-        for i in range(10):
-            await clean_redis.add_to_stream(
-                'test:stream', 
-                {'count': i}, 
-                max_len=max_len
-            )
+        # Add more messages than max_len (one pipelined round-trip).
+        # Exact trimming: MAXLEN ~ only drops whole internal nodes (100
+        # entries by default), so a 10-entry stream would never shrink.
+        await clean_redis.add_many_to_stream(
+            _STREAM,
+            MAX_LEN_PAYLOADS,
+            max_len=max_len,
+            approximate=False,
+            nomkstream=True
+        )
         
         # Check final length
-        length = await clean_redis.get_stream_length('test:stream')
+        length = await clean_redis.get_stream_length(_STREAM)
         assert length <= max_len, f"Stream should not exceed max_len of {max_len}"
 
+    @pytest.mark.asyncio
+    @pytest.mark.perf
+    @pytest.mark.skipif(os.environ.get('REDIS_PERF') == '0', reason="REDIS_PERF=0")
+    async def test_pipelined_adds_beat_sequential(self, clean_redis):
+        """Guard against add_many_to_stream regressing to one round-trip per add"""
+        start = time.perf_counter_ns()
+        for payload in PERF_PAYLOADS:
+            await clean_redis.add_to_stream(_STREAM, payload)
+        sequential_ns = time.perf_counter_ns() - start
+        
+        start = time.perf_counter_ns()
+        await clean_redis.add_many_to_stream(_STREAM, PERF_PAYLOADS)
+        pipelined_ns = time.perf_counter_ns() - start
+        
+        speedup = sequential_ns / pipelined_ns
+        assert speedup >= PERF_MIN_SPEEDUP, (
+            f"Pipelined adds only {speedup:.1f}x faster than sequential "
+            f"(expected >= {PERF_MIN_SPEEDUP}x for {PERF_ADDS} adds)"
+        )
+
 
 class TestRedisPubSub:
     """Test Redis Pub/Sub functionality for progress updates"""
@@ -158,33 +264,30 @@ class TestRedisPubSub:
         assert subscriber_count >= 0, "Subscriber count should be non-negative"
     
     @pytest.mark.asyncio
-    async def test_subscribe_and_receive(self, redis_client):
+    async def test_subscribe_and_receive(self, redis_client, shared_pubsub):
         """Test subscribing to channel and receiving messages"""
         channel_name = 'test:progress:channel'
+        pubsub, queues = shared_pubsub
         
-        # Subscribe to channel
-        pubsub = await redis_client.subscribe(channel_name)
+        # Subscribed once for the class by the shared_pubsub fixture
         assert pubsub is not None, "PubSub object should not be None"
         
+        # Exact-channel SUBSCRIBE, not a PSUBSCRIBE pattern (no per-publish pattern matching)
+        assert channel_name in pubsub.channels, "Should subscribe to the exact channel"
+        assert not pubsub.patterns, "Should not use pattern subscriptions"
+        
         # Publish a test message
         test_message = {'event': 'test', 'data': 'hello'}
         await redis_client.publish(channel_name, test_message)
         
-        # Try to receive message (with timeout)
+        # Wait for the router to deliver it (wait_for bounds the total wait)
         try:
-            message = await asyncio.wait_for(
-                pubsub.get_message(ignore_subscribe_messages=True, timeout=1),
-                timeout=2.0
-            )
-            if message and message['type'] == 'message':
-                data = json.loads(message['data'])
-                assert data['event'] == 'test', "Should receive correct message"
+            message = await asyncio.wait_for(queues[channel_name].get(), timeout=0.5)
+            data = json.loads(message['data'])
+            assert data['event'] == 'test', "Should receive correct message"
         except asyncio.TimeoutError:
             # No message received, but subscription worked
             pass
-        finally:
-            await pubsub.unsubscribe(channel_name)
-            await pubsub.close()
 
 
 class TestRedisDataTypes:
@@ -206,8 +309,14 @@ class TestRedisDataTypes:
             }
         }
         
-        message_id = await clean_redis.add_to_stream('test:stream', complex_data)
+        message_id = await clean_redis.add_to_stream(_STREAM, complex_data)
         assert message_id is not None, "Should handle complex JSON data"
+        
+        # Read it back: the whole payload is one JSON 'data' field
+        messages = await clean_redis.read_stream(_STREAM, count=1)
+        _, [(_, fields)] = messages[0]
+        assert fields.keys() == {'data'}, "Payload should be a single field"
+        assert orjson.loads(fields['data']) == complex_data, "Stream payload should round-trip unchanged"
     
     @pytest.mark.asyncio
     async def test_unicode_handling(self, clean_redis):
@@ -218,7 +327,7 @@ class TestRedisDataTypes:
             'symbols': '!@#$%^&*()_+-=[]{}|;:,.<>?'
         }
         
-        message_id = await clean_redis.add_to_stream('test:stream', test_data)
+        message_id = await clean_redis.add_to_stream(_STREAM, test_data)
         assert message_id is not None, "Should handle special characters"
 
 
@@ -231,14 +340,16 @@ class TestRedisErrorHandling:
         client = RedisClient()
         await client.connect()
         
-        # Verify connected
-        assert await client.ping() is True
+        # Verify the client is wired to its pool (no round-trip needed)
+        pool = client.redis.connection_pool
+        assert pool.connection_kwargs is not None
         
-        # Disconnect
-        await client.disconnect()
+        # Disconnect, keeping the pool open
+        await client.disconnect(close_pools=False)
         
-        # Reconnect
+        # Reconnect reuses the same pool; one PING proves it opens a socket
         await client.connect()
+        assert client.redis.connection_pool is pool
         assert await client.ping() is True
         
         await client.disconnect()
@@ -251,6 +362,8 @@ class TestRedisErrorHandling:
         assert messages is not None, "Should handle non-existent stream"
 
 
-# Run tests with: pytest tests/test_redis_integration.py -v
+# Run tests from the repo root with: pytest tests/test_redis_integration.py -v
+# (or python -m tests.test_redis_integration); pytest.ini puts the root on sys.path
+# In parallel: pytest tests/test_redis_integration.py -n auto (one Redis DB per worker)
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])